@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Admission control for the LLM Wordle player servers
+Bounds the number of concurrent inference calls, queues a limited number of
+waiting requests and rejects the rest quickly so the referee can back off
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Header used by the referee to tell a player how long it is willing to wait
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# Time reserved for serializing and sending the response back to the referee
+DEADLINE_SAFETY_MARGIN = 1.0
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted (queue full, draining or deadline expired)
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when the referee's deadline has passed before the work could start
+    """
+
+
+def deadline_from_headers(headers, default_timeout: Optional[float] = None) -> Optional[float]:
+    """
+    Converts the referee's timeout budget into an absolute local deadline.
+    A relative budget is used instead of a timestamp so clock skew between
+    WSL and the Windows host does not matter.
+    """
+    raw_timeout = headers.get(DEADLINE_HEADER)
+    try:
+        budget = float(raw_timeout) if raw_timeout is not None else default_timeout
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid {DEADLINE_HEADER} header: {raw_timeout}")
+        budget = default_timeout
+
+    if budget is None:
+        return None
+    return time.monotonic() + max(budget - DEADLINE_SAFETY_MARGIN, 0.0)
+
+
+def time_remaining(deadline: Optional[float]) -> Optional[float]:
+    """Returns the seconds left before the deadline, or None when there is no deadline"""
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class AdmissionController:
+    """
+    Bounded FIFO queue in front of a fixed number of inference slots
+    """
+
+    def __init__(self, inference_slots: int = 1, max_queue: int = 4, initial_service_time: float = 20.0):
+        self.inference_slots = max(1, inference_slots)
+        self.max_queue = max(0, max_queue)
+
+        self._condition = threading.Condition()
+        self._waiting = deque()
+        self._next_ticket = 0
+        self._active = 0
+        self._draining = False
+
+        # Exponentially weighted moving average of how long a slot is held
+        self._service_time = initial_service_time
+
+        self._stats = {
+            'admitted': 0,
+            'completed': 0,
+            'rejected_queue_full': 0,
+            'rejected_draining': 0,
+            'expired_in_queue': 0,
+            'max_queue_depth': 0,
+            'total_queue_wait': 0.0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Builds a controller from PLAYER_INFERENCE_SLOTS and PLAYER_MAX_QUEUE"""
+        return cls(
+            inference_slots=get_setting('PLAYER_INFERENCE_SLOTS', 1, int),
+            max_queue=get_setting('PLAYER_MAX_QUEUE', 4, int)
+        )
+
+    def estimate_retry_after(self) -> int:
+        """Estimates how many seconds a rejected caller should wait before retrying"""
+        backlog = len(self._waiting) + 1
+        return max(1, math.ceil(self._service_time * backlog / self.inference_slots))
+
+    @contextmanager
+    def slot(self, deadline: Optional[float] = None):
+        """
+        Context manager that holds an inference slot for the duration of the block.
+        Raises AdmissionRejected if the queue is full or the deadline passes while queued.
+        """
+        enqueued_at = time.monotonic()
+
+        with self._condition:
+            if self._draining:
+                self._stats['rejected_draining'] += 1
+                raise AdmissionRejected(503, "Server is shutting down", self.estimate_retry_after())
+
+            if self._active >= self.inference_slots or self._waiting:
+                if len(self._waiting) >= self.max_queue:
+                    self._stats['rejected_queue_full'] += 1
+                    raise AdmissionRejected(429, "Inference queue is full", self.estimate_retry_after())
+
+                ticket = self._next_ticket
+                self._next_ticket += 1
+                self._waiting.append(ticket)
+                self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], len(self._waiting))
+
+                try:
+                    while self._active >= self.inference_slots or self._waiting[0] != ticket:
+                        remaining = time_remaining(deadline)
+                        if remaining is not None and remaining <= 0:
+                            self._stats['expired_in_queue'] += 1
+                            raise AdmissionRejected(503, "Deadline expired while queued", self.estimate_retry_after())
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting.remove(ticket)
+                    self._condition.notify_all()
+
+            self._active += 1
+            self._stats['admitted'] += 1
+            self._stats['total_queue_wait'] += time.monotonic() - enqueued_at
+
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._stats['completed'] += 1
+                self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - started_at)
+                self._condition.notify_all()
+
+    def start_draining(self):
+        """Stops admitting new work; requests already queued or running are allowed to finish"""
+        with self._condition:
+            self._draining = True
+            self._condition.notify_all()
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until no request is queued or running. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._active or self._waiting:
+                remaining = time_remaining(deadline)
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns a snapshot of the queue and slot counters"""
+        with self._condition:
+            admitted = self._stats['admitted']
+            return {
+                'inference_slots': self.inference_slots,
+                'active': self._active,
+                'queue_depth': len(self._waiting),
+                'max_queue': self.max_queue,
+                'draining': self._draining,
+                'avg_service_time': round(self._service_time, 3),
+                'avg_queue_wait': round(self._stats['total_queue_wait'] / admitted, 3) if admitted else 0.0,
+                **{key: value for key, value in self._stats.items() if key != 'total_queue_wait'}
+            }
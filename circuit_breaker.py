@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker for the LLM Wordle backends
+Tracks failures and latency per backend, opens quickly when a backend is down
+and probes it in the background so callers fail in milliseconds during an outage
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after consecutive failures, open -> half-open once a
+    background probe succeeds, half-open -> closed after one good call
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, probe: Optional[Callable[[], bool]] = None,
+                 failure_threshold: int = 3, slow_call_threshold: Optional[float] = None,
+                 probe_interval: float = 5.0):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_threshold = slow_call_threshold
+        self.probe_interval = probe_interval
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+        self._probe_thread = None
+        self._opened_at = None
+
+        self._consecutive_failures = 0
+        self._total_successes = 0
+        self._total_failures = 0
+        self._rejected = 0
+        self._avg_latency = None
+        self._last_error = None
+        self._last_probe_at = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a call to the backend should be attempted.
+        While open, calls are rejected without touching the backend; while
+        half-open a single trial call is let through.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and self.probe is None:
+                # Without a probe, fall back to a timed recovery window
+                if time.monotonic() - self._opened_at >= self.probe_interval:
+                    self._state = self.HALF_OPEN
+
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            self._rejected += 1
+            return False
+
+    def record_success(self, latency: float):
+        """Records a completed call; slow calls count as failures"""
+        if self.slow_call_threshold is not None and latency > self.slow_call_threshold:
+            self.record_failure(f"slow call ({latency:.1f}s)", latency)
+            return
+
+        with self._lock:
+            self._update_latency(latency)
+            self._total_successes += 1
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+                self._state = self.CLOSED
+
+    def record_failure(self, error: str, latency: Optional[float] = None):
+        """Records a failed call and opens the circuit once the threshold is reached"""
+        with self._lock:
+            if latency is not None:
+                self._update_latency(latency)
+            self._total_failures += 1
+            self._consecutive_failures += 1
+            self._last_error = error
+            self._trial_in_flight = False
+
+            should_open = (self._state == self.HALF_OPEN or
+                           self._consecutive_failures >= self.failure_threshold)
+            if should_open and self._state != self.OPEN:
+                self._open()
+
+    def release(self):
+        """
+        Releases a half-open trial that ended without an outcome because the
+        caller's deadline ran out first; the next call becomes the trial
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def probe_now(self) -> bool:
+        """
+        Runs the probe synchronously; used at startup so a backend that is
+        already down opens the circuit before the first request arrives
+        """
+        if self.probe is None:
+            return True
+        healthy = self._run_probe()
+        with self._lock:
+            if not healthy and self._state != self.OPEN:
+                self._consecutive_failures = self.failure_threshold
+                self._last_error = "startup probe failed"
+                self._open()
+        return healthy
+
+    def status(self) -> Dict[str, Any]:
+        """Returns a snapshot of the breaker state for health endpoints"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': self._state,
+                'ready': self._state != self.OPEN,
+                'consecutive_failures': self._consecutive_failures,
+                'total_successes': self._total_successes,
+                'total_failures': self._total_failures,
+                'rejected_calls': self._rejected,
+                'avg_latency': round(self._avg_latency, 3) if self._avg_latency is not None else None,
+                'last_error': self._last_error,
+                'open_for': round(time.monotonic() - self._opened_at, 1) if self._state == self.OPEN else 0.0,
+            }
+
+    def _update_latency(self, latency: float):
+        if self._avg_latency is None:
+            self._avg_latency = latency
+        else:
+            self._avg_latency = 0.8 * self._avg_latency + 0.2 * latency
+
+    def _open(self):
+        """Opens the circuit and starts background probing. Caller holds the lock."""
+        logger.warning(f"Circuit for {self.name} opened: {self._last_error}")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+        if self.probe is not None and (self._probe_thread is None or not self._probe_thread.is_alive()):
+            self._probe_thread = threading.Thread(target=self._probe_loop, name=f"probe-{self.name}")
+            self._probe_thread.daemon = True
+            self._probe_thread.start()
+
+    def _run_probe(self) -> bool:
+        try:
+            healthy = bool(self.probe())
+        except Exception as e:
+            logger.debug(f"Probe for {self.name} failed: {e}")
+            healthy = False
+        with self._lock:
+            self._last_probe_at = time.monotonic()
+        return healthy
+
+    def _probe_loop(self):
+        """Probes the backend until it recovers, then lets one trial call through"""
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                if self._state != self.OPEN:
+                    return
+            if self._run_probe():
+                with self._lock:
+                    if self._state == self.OPEN:
+                        logger.info(f"Probe for {self.name} succeeded, circuit half-open")
+                        self._state = self.HALF_OPEN
+                        self._trial_in_flight = False
+                return
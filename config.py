@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Configuration for the LLM Wordle servers
+Each setting is read from the environment first, then from the JSON file named
+by WORDLE_CONFIG (default: wordle_config.json in the working directory), and
+finally falls back to the built-in default
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = 'wordle_config.json'
+
+_file_settings = None
+_file_lock = threading.Lock()
+
+
+def load_config_file() -> Dict[str, Any]:
+    """Loads the JSON config file once; a missing file means no overrides"""
+    global _file_settings
+    with _file_lock:
+        if _file_settings is None:
+            path = os.environ.get('WORDLE_CONFIG', DEFAULT_CONFIG_PATH)
+            try:
+                with open(path, 'r', encoding='utf-8') as config_file:
+                    _file_settings = json.load(config_file)
+                logger.info(f"Loaded configuration from {path}")
+            except FileNotFoundError:
+                _file_settings = {}
+            except (OSError, ValueError) as e:
+                logger.error(f"Ignoring unreadable config file {path}: {e}")
+                _file_settings = {}
+        return _file_settings
+
+
+def get_setting(name: str, default: Any = None, cast: Optional[Callable[[Any], Any]] = None) -> Any:
+    """
+    Returns a setting by its environment variable name.
+    Empty values count as unset; cast=bool accepts 1/true/yes/on.
+    """
+    value = os.environ.get(name)
+    if value is None or value == '':
+        value = load_config_file().get(name)
+    if value is None or value == '':
+        return default
+
+    if cast is bool:
+        return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+    return cast(value) if cast else value
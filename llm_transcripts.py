@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Record/replay layer for LLM calls
+Records prompt -> response pairs into an indexed transcript file and serves
+them back from a memory-mapped index, so games can be replayed at full speed
+on a machine with no models installed
+
+Usage:
+    WORDLE_LLM_MODE=record python player1_server.py    # capture live responses
+    WORDLE_LLM_MODE=replay python player1_server.py    # serve them back
+    python llm_transcripts.py stats transcripts/llama.cpp
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Index entries: 16-byte key digest, data offset, record length
+INDEX_ENTRY = struct.Struct('<16sQI')
+
+MODES = ('live', 'record', 'replay')
+
+
+def transcript_key(backend: str, prompt: str, options: Dict[str, Any]) -> bytes:
+    """Digest identifying a call by backend, prompt and sampling options"""
+    material = json.dumps([backend, prompt, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(material.encode('utf-8'), digest_size=16).digest()
+
+
+def build_index(data_path: str, index_path: str) -> int:
+    """
+    Rebuilds the sorted index from the transcript data file.
+    Entries with the same key keep their recording order.
+    Returns the number of records indexed.
+    """
+    entries = []
+    with open(data_path, 'rb') as data_file:
+        offset = 0
+        for line in data_file:
+            if line.strip():
+                record = json.loads(line)
+                entries.append((bytes.fromhex(record['key']), offset, len(line)))
+            offset += len(line)
+
+    entries.sort(key=lambda entry: (entry[0], entry[1]))
+    # Each process writes its own temp file: gunicorn workers recording to
+    # the same transcript all rebuild the index when they exit
+    descriptor, temp_path = tempfile.mkstemp(
+        prefix=os.path.basename(index_path) + '.', suffix='.tmp',
+        dir=os.path.dirname(os.path.abspath(index_path))
+    )
+    try:
+        with os.fdopen(descriptor, 'wb') as index_file:
+            for entry in entries:
+                index_file.write(INDEX_ENTRY.pack(*entry))
+        os.replace(temp_path, index_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(entries)
+
+
+class TranscriptRecorder:
+    """
+    Appends prompt -> response records and rewrites the sorted index on close
+    """
+
+    def __init__(self, path: str, backend: str):
+        self.backend = backend
+        self.data_path = path + '.dat'
+        self.index_path = path + '.idx'
+        os.makedirs(os.path.dirname(os.path.abspath(self.data_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._data_file = open(self.data_path, 'ab')
+        self._recorded = 0
+        atexit.register(self.close)
+
+    def record(self, prompt: str, options: Dict[str, Any], response: str, latency: float):
+        record = {
+            'key': transcript_key(self.backend, prompt, options).hex(),
+            'backend': self.backend,
+            'options': options,
+            'prompt': prompt,
+            'response': response,
+            'latency': round(latency, 3),
+        }
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            if self._data_file is None:
+                return
+            self._data_file.write(line)
+            self._data_file.flush()
+            self._recorded += 1
+
+    def close(self):
+        with self._lock:
+            if self._data_file is None:
+                return
+            self._data_file.close()
+            self._data_file = None
+        count = build_index(self.data_path, self.index_path)
+        logger.info(f"Recorded {self._recorded} new transcript(s), {count} indexed in {self.index_path}")
+
+
+class TranscriptReplayer:
+    """
+    Serves recorded responses by binary search over the memory-mapped index.
+    Repeated calls with the same key cycle through the recorded responses in order.
+    """
+
+    def __init__(self, path: str, backend: str):
+        self.backend = backend
+        self.data_path = path + '.dat'
+        self.index_path = path + '.idx'
+
+        if not os.path.exists(self.data_path):
+            raise FileNotFoundError(
+                f"No recorded transcripts at {self.data_path}; record them first with "
+                f"WORDLE_LLM_MODE=record (and WORDLE_TRANSCRIPT_PATH={path} if it is not the default)"
+            )
+
+        stale = (not os.path.exists(self.index_path) or
+                 os.path.getmtime(self.index_path) < os.path.getmtime(self.data_path))
+        if stale:
+            logger.info(f"Rebuilding transcript index {self.index_path}")
+            build_index(self.data_path, self.index_path)
+
+        self._data_file = open(self.data_path, 'rb')
+        self._index_file = open(self.index_path, 'rb')
+        self._data = self._map(self._data_file)
+        self._index = self._map(self._index_file)
+        self.count = len(self._index) // INDEX_ENTRY.size if self._index else 0
+
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _map(file_obj) -> Optional[mmap.mmap]:
+        if os.fstat(file_obj.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _key_at(self, position: int) -> bytes:
+        start = position * INDEX_ENTRY.size
+        return self._index[start:start + 16]
+
+    def lookup(self, prompt: str, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Returns the next recorded record for this call, or None when it was never recorded"""
+        key = transcript_key(self.backend, prompt, options)
+
+        # Lower bound of the key in the sorted index
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        first = low
+        last = first
+        while last < self.count and self._key_at(last) == key:
+            last += 1
+
+        with self._lock:
+            if first == last:
+                self.misses += 1
+                return None
+            self.hits += 1
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+
+        _, offset, length = INDEX_ENTRY.unpack_from(self._index, (first + cursor % (last - first)) * INDEX_ENTRY.size)
+        return json.loads(self._data[offset:offset + length])
+
+
+class LLMTranscripts:
+    """
+    Mode switch used by the players: live (default), record or replay
+    """
+
+    def __init__(self, backend: str, mode: str = 'live', path: Optional[str] = None,
+                 replay_latency: Optional[str] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown WORDLE_LLM_MODE {mode!r}; expected one of {', '.join(MODES)}")
+        self.backend = backend
+        self.mode = mode
+        self.path = path or os.path.join('transcripts', backend)
+        self.replay_latency = replay_latency
+        self.recorder = TranscriptRecorder(self.path, backend) if mode == 'record' else None
+        self.replayer = TranscriptReplayer(self.path, backend) if mode == 'replay' else None
+
+        if mode != 'live':
+            logger.info(f"LLM transcripts for {backend}: {mode} mode using {self.path}")
+
+    @classmethod
+    def from_env(cls, backend: str) -> "LLMTranscripts":
+        """
+        WORDLE_LLM_MODE selects live/record/replay, WORDLE_TRANSCRIPT_PATH the
+        transcript file prefix and WORDLE_REPLAY_LATENCY the simulated latency
+        (seconds, or 'recorded' to reproduce the recorded latency)
+        """
+        return cls(
+            backend,
+            mode=get_setting('WORDLE_LLM_MODE', 'live'),
+            path=get_setting('WORDLE_TRANSCRIPT_PATH'),
+            replay_latency=get_setting('WORDLE_REPLAY_LATENCY', cast=str)
+        )
+
+    @property
+    def replaying(self) -> bool:
+        return self.replayer is not None
+
+    def record(self, prompt: str, options: Dict[str, Any], response: str, latency: float):
+        if self.recorder is not None:
+            self.recorder.record(prompt, options, response, latency)
+
+    def replay(self, prompt: str, options: Dict[str, Any],
+               cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        Returns the recorded response after the simulated latency, or None on a miss.
+        Returns an empty string if cancel_event is set while waiting.
+        """
+        record = self.replayer.lookup(prompt, options)
+        if record is None:
+            logger.warning(f"No recorded {self.backend} transcript for this prompt")
+            return None
+
+        if self.replay_latency == 'recorded':
+            delay = record.get('latency', 0.0)
+        else:
+            delay = float(self.replay_latency or 0.0)
+
+        if delay > 0:
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    return ""
+            else:
+                time.sleep(delay)
+        return record['response']
+
+    def metrics(self) -> Dict[str, Any]:
+        result = {'mode': self.mode, 'path': self.path}
+        if self.replayer is not None:
+            result.update({
+                'records': self.replayer.count,
+                'hits': self.replayer.hits,
+                'misses': self.replayer.misses
+            })
+        return result
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) != 3 or sys.argv[1] not in ('stats', 'reindex'):
+        print("Usage: python llm_transcripts.py stats|reindex <transcript path prefix>")
+        sys.exit(1)
+
+    command, prefix = sys.argv[1], sys.argv[2]
+    if command == 'reindex':
+        print(f"Indexed {build_index(prefix + '.dat', prefix + '.idx')} record(s)")
+    else:
+        replayer = TranscriptReplayer(prefix, backend='')
+        unique_keys = len({replayer._key_at(i) for i in range(replayer.count)})
+        print(json.dumps({
+            'records': replayer.count,
+            'unique_prompts': unique_keys,
+            'data_bytes': os.path.getsize(prefix + '.dat'),
+            'index_bytes': os.path.getsize(prefix + '.idx'),
+        }, indent=2))
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator for the LLM Wordle player servers
+Sends realistic /get_guess payloads (mid-game histories, referee retry
+messages) at fixed arrival rates, one step per rate, and reports throughput,
+latency percentiles, error and RETRY rates and the saturation point.
+
+Requests are sent on schedule whether or not earlier ones have finished, and
+latency is measured from the scheduled send time, so a saturated server shows
+up as growing latency instead of a slower request rate.
+
+Usage:
+    python load_test.py run --player player2 --rates 0.1 0.2 0.5 1 --duration 60
+    python load_test.py run --url http://localhost:5001/get_guess --csv capacity.csv
+
+Stubbed LLMs, for testing the Python side without a model:
+    python load_test.py stub-ollama --port 11434 --latency 2.0
+    python load_test.py stub-llama --output stub/llama-run --latency 2.0
+"""
+
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import random
+import stat
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional
+
+import requests
+
+from admission_control import DEADLINE_HEADER
+from config import get_setting
+from precomputed import get_tables
+from wordle_logic import WORD_LIST, evaluate_guess, is_consistent
+
+logger = logging.getLogger(__name__)
+
+# Same wording as the referee's requests
+PLAYER_MESSAGE = 'You are competing against another AI player. Good luck!'
+RETRY_MESSAGE = ' [RETRY {attempt}/{max_retries}] Please use the format: GUESS: YOURWORD'
+MAX_RETRIES = 2
+MAX_TURNS = 6
+
+DICTIONARY = [word for word in WORD_LIST if len(word) == 5 and word.isalpha()]
+
+
+def make_payload(rng: random.Random, retry_fraction: float = 0.1) -> Dict[str, Any]:
+    """
+    Builds a /get_guess request from a plausible game in progress: a random
+    turn, earlier guesses that are consistent with the feedback they received,
+    and the referee's retry message on a fraction of requests
+    """
+    secret = rng.choice(DICTIONARY)
+    turn_number = rng.randint(1, MAX_TURNS)
+
+    tables = get_tables()
+    history = []
+    for _ in range(turn_number - 1):
+        if tables is not None:
+            candidates = [word for word in tables.candidates(history) if word != secret]
+        else:
+            candidates = [word for word in DICTIONARY if word != secret and is_consistent(word, history)]
+        guess = rng.choice(candidates or DICTIONARY)
+        history.append({'guess': guess, 'feedback': evaluate_guess(guess, secret)})
+
+    player_message = PLAYER_MESSAGE
+    if rng.random() < retry_fraction:
+        player_message += RETRY_MESSAGE.format(attempt=rng.randint(1, MAX_RETRIES), max_retries=MAX_RETRIES)
+
+    return {
+        'turn_number': turn_number,
+        'max_turns': MAX_TURNS,
+        'history': history,
+        'player_message': player_message
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def classify(response: Optional[requests.Response]) -> str:
+    """
+    Outcome of one request:
+    ok, retry (player could not produce a guess), rejected (429/503 backpressure),
+    timeout (504 or no answer in time) or error
+    """
+    if response is None:
+        return 'timeout'
+    if response.status_code == 200:
+        try:
+            word = response.json().get('word_guess')
+        except ValueError:
+            return 'error'
+        return 'retry' if word == 'RETRY' else 'ok'
+    if response.status_code in (429, 503):
+        return 'rejected'
+    if response.status_code == 504:
+        return 'timeout'
+    return 'error'
+
+
+class LoadGenerator:
+    """
+    Runs one open-loop step per arrival rate against a single /get_guess URL
+    """
+
+    def __init__(self, url: str, timeout: float = 120.0, retry_fraction: float = 0.1,
+                 arrivals: str = 'poisson', max_in_flight: int = 256, seed: int = 0):
+        self.url = url
+        self.timeout = timeout
+        self.retry_fraction = retry_fraction
+        self.arrivals = arrivals
+        self.max_in_flight = max_in_flight
+        self.rng = random.Random(seed)
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _send(self, payload: Dict[str, Any], scheduled_at: float, results: List[Dict[str, Any]],
+              lock: threading.Lock, in_flight: threading.Semaphore):
+        response = None
+        try:
+            response = self._session().post(
+                self.url,
+                json=payload,
+                headers={DEADLINE_HEADER: str(self.timeout)},
+                timeout=self.timeout
+            )
+        except requests.Timeout:
+            pass
+        except requests.RequestException as e:
+            logger.debug(f"Request failed: {e}")
+            response = False
+        finally:
+            in_flight.release()
+
+        outcome = 'error' if response is False else classify(response)
+        with lock:
+            results.append({
+                'outcome': outcome,
+                'latency': time.monotonic() - scheduled_at,
+                'turn_number': payload['turn_number'],
+                'finished_at': time.monotonic()
+            })
+
+    def _interval(self, rate: float) -> float:
+        if self.arrivals == 'uniform':
+            return 1.0 / rate
+        return self.rng.expovariate(rate)
+
+    def run_step(self, rate: float, duration: float) -> Dict[str, Any]:
+        """Sends requests at the given rate for duration seconds and waits for all of them"""
+        results = []
+        lock = threading.Lock()
+        in_flight = threading.Semaphore(self.max_in_flight)
+        threads = []
+        dropped = 0
+
+        # Build the schedule and payloads up front so sending never falls behind
+        offsets = []
+        offset = self._interval(rate)
+        while offset < duration:
+            offsets.append(offset)
+            offset += self._interval(rate)
+        payloads = [make_payload(self.rng, self.retry_fraction) for _ in offsets]
+
+        started_at = time.monotonic()
+        for offset, payload in zip(offsets, payloads):
+            next_send = started_at + offset
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            if not in_flight.acquire(blocking=False):
+                # Client-side limit reached; count it rather than slowing the arrival rate
+                dropped += 1
+            else:
+                thread = threading.Thread(
+                    target=self._send,
+                    args=(payload, next_send, results, lock, in_flight),
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+        finished_at = max([result['finished_at'] for result in results], default=time.monotonic())
+
+        return self.summarize(rate, duration, results, dropped, max(finished_at - started_at, duration))
+
+    def summarize(self, rate: float, duration: float, results: List[Dict[str, Any]],
+                  dropped: int, elapsed: float) -> Dict[str, Any]:
+        counts = {outcome: 0 for outcome in ('ok', 'retry', 'rejected', 'timeout', 'error')}
+        for result in results:
+            counts[result['outcome']] += 1
+        sent = len(results) + dropped
+        answered = sorted(result['latency'] for result in results if result['outcome'] in ('ok', 'retry'))
+
+        def ratio(count):
+            return round(count / sent, 4) if sent else 0.0
+
+        return {
+            'offered_rate': rate,
+            'duration': duration,
+            'sent': sent,
+            **counts,
+            'dropped': dropped,
+            'throughput': round(len(answered) / elapsed, 3),
+            'goodput': round(counts['ok'] / elapsed, 3),
+            'error_rate': ratio(counts['rejected'] + counts['timeout'] + counts['error'] + dropped),
+            'retry_rate': ratio(counts['retry']),
+            'latency_p50': round(percentile(answered, 0.50), 3) if answered else None,
+            'latency_p90': round(percentile(answered, 0.90), 3) if answered else None,
+            'latency_p99': round(percentile(answered, 0.99), 3) if answered else None,
+            'latency_max': round(answered[-1], 3) if answered else None,
+        }
+
+    def server_metrics(self) -> Optional[Dict[str, Any]]:
+        """The player's /metrics snapshot, recorded with each step for context"""
+        try:
+            return requests.get(self.url.rsplit('/', 1)[0] + '/metrics', timeout=5).json()
+        except (requests.RequestException, ValueError):
+            return None
+
+
+def is_sustained(step: Dict[str, Any], latency_slo: float, error_budget: float) -> bool:
+    """
+    A step is sustained when the server keeps up with the offered rate,
+    stays inside the error budget and meets the p99 latency objective
+    """
+    if step['latency_p99'] is None:
+        return False
+    keeping_up = step['throughput'] >= 0.9 * step['sent'] / step['duration']
+    return keeping_up and step['error_rate'] <= error_budget and step['latency_p99'] <= latency_slo
+
+
+def run_load_test(generator: LoadGenerator, rates: List[float], duration: float,
+                  latency_slo: float, error_budget: float) -> Dict[str, Any]:
+    """Runs the rate steps in increasing order and locates the saturation point"""
+    steps = []
+    max_sustainable = None
+    saturation = None
+    for rate in sorted(rates):
+        logger.info(f"Offering {rate} req/s for {duration}s")
+        step = generator.run_step(rate, duration)
+        step['sustained'] = is_sustained(step, latency_slo, error_budget)
+        step['server_metrics'] = generator.server_metrics()
+        steps.append(step)
+        logger.info(f"  throughput {step['throughput']} req/s, p99 {step['latency_p99']}s, "
+                    f"errors {step['error_rate']:.1%}, retries {step['retry_rate']:.1%}")
+
+        if step['sustained'] and saturation is None:
+            max_sustainable = rate
+        elif saturation is None:
+            saturation = rate
+
+    return {
+        'url': generator.url,
+        'arrivals': generator.arrivals,
+        'retry_fraction': generator.retry_fraction,
+        'latency_slo': latency_slo,
+        'error_budget': error_budget,
+        'max_sustainable_rate': max_sustainable,
+        'saturation_rate': saturation,
+        'steps': steps
+    }
+
+
+CSV_FIELDS = ['offered_rate', 'duration', 'sent', 'ok', 'retry', 'rejected', 'timeout', 'error', 'dropped',
+              'throughput', 'goodput', 'error_rate', 'retry_rate',
+              'latency_p50', 'latency_p90', 'latency_p99', 'latency_max', 'sustained']
+
+
+def write_csv(report: Dict[str, Any], path: str):
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(report['steps'])
+
+
+def print_table(report: Dict[str, Any]):
+    print(f"{'rate':>8} {'tput':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'errors':>8} {'retries':>8}  sustained")
+    for step in report['steps']:
+        def seconds(value):
+            return f"{value:8.2f}" if value is not None else f"{'-':>8}"
+        print(f"{step['offered_rate']:8.3f} {step['throughput']:8.3f} {seconds(step['latency_p50'])} "
+              f"{seconds(step['latency_p90'])} {seconds(step['latency_p99'])} "
+              f"{step['error_rate']:8.1%} {step['retry_rate']:8.1%}  {'yes' if step['sustained'] else 'no'}")
+    print(f"Max sustainable rate: {report['max_sustainable_rate']} req/s, "
+          f"saturation at: {report['saturation_rate']} req/s")
+
+
+def stub_response(rng: random.Random, bad_format_rate: float) -> str:
+    """Model-like text: a short rationale and a GUESS line, or no guess at all"""
+    word = rng.choice(DICTIONARY)
+    if rng.random() < bad_format_rate:
+        return f"Hmm, something like {word.lower()} maybe, I'm not sure."
+    return f"Let me think about the letters I know so far. {word} looks promising.\nGUESS: {word}"
+
+
+def serve_stub_ollama(port: int, latency: float, jitter: float, bad_format_rate: float):
+    """
+    Minimal stand-in for the Ollama API (/api/tags and /api/generate) with a
+    configurable generation latency, for load testing player2_server
+    """
+    rng = random.Random()
+    model_name = get_setting('OLLAMA_MODEL', "gemma3:latest")
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def _send_json(self, body: Dict[str, Any]):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/api/tags':
+                self._send_json({'models': [{'name': model_name}]})
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            if self.path != '/api/generate':
+                self.send_error(404)
+                return
+            request_body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not request_body.get('prompt'):
+                # Model load request
+                self._send_json({'model': model_name, 'response': '', 'done': True})
+                return
+
+            time.sleep(max(0.0, rng.gauss(latency, jitter)))
+            text = stub_response(rng, bad_format_rate)
+            if request_body.get('stream'):
+                lines = [{'response': token + ' ', 'done': False} for token in text.split(' ')]
+                lines.append({'response': '', 'done': True})
+                data = ''.join(json.dumps(line) + '\n' for line in lines).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            else:
+                self._send_json({'model': model_name, 'response': text, 'done': True})
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    logger.info(f"Stub Ollama listening on http://127.0.0.1:{port}/api/generate ({latency}s +/- {jitter}s)")
+    server.serve_forever()
+
+
+STUB_LLAMA_TEMPLATE = '''#!{python}
+# Stand-in for llama-run written by load_test.py: sleeps, then prints a guess.
+# Standard library only, so interpreter start-up is the only overhead per call.
+import random, time
+WORDS = {words!r}.split()
+rng = random.Random()
+time.sleep(max(0.0, rng.gauss({latency!r}, {jitter!r})))
+word = rng.choice(WORDS)
+if rng.random() < {bad_format_rate!r}:
+    print(f"Hmm, something like {{word.lower()}} maybe, I'm not sure.")
+else:
+    print(f"Let me think about the letters I know so far. {{word}} looks promising.\\nGUESS: {{word}}")
+'''
+
+
+def write_stub_llama(output: str, latency: float, jitter: float, bad_format_rate: float):
+    """Writes an executable llama-run stand-in and an empty model file next to it"""
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as stub_file:
+        stub_file.write(STUB_LLAMA_TEMPLATE.format(
+            python=sys.executable,
+            words=' '.join(DICTIONARY),
+            latency=latency,
+            jitter=jitter,
+            bad_format_rate=bad_format_rate
+        ))
+    os.chmod(output, os.stat(output).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    model_path = os.path.join(os.path.dirname(os.path.abspath(output)), 'stub-model.gguf')
+    open(model_path, 'a').close()
+    print(f"LLAMA_CPP_PATH={os.path.abspath(output)} LLAMA_MODEL_PATH={model_path}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Load test the LLM Wordle player servers")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subcommands.add_parser('run', help="Run an open-loop load test")
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help="/get_guess URL to load")
+    target.add_argument('--player', choices=['player1', 'player2'], default='player1',
+                        help="Player to load, using PLAYER1_URL/PLAYER2_URL")
+    run_parser.add_argument('--rates', type=float, nargs='+', default=[0.05, 0.1, 0.2, 0.5, 1.0],
+                            help="Arrival rates to offer, in requests per second")
+    run_parser.add_argument('--duration', type=float, default=60.0, help="Seconds per rate step")
+    run_parser.add_argument('--arrivals', choices=['poisson', 'uniform'], default='poisson')
+    run_parser.add_argument('--timeout', type=float, default=120.0,
+                            help="Per-request timeout, also sent as the deadline header")
+    run_parser.add_argument('--retry-fraction', type=float, default=0.1,
+                            help="Fraction of requests carrying the referee's RETRY message")
+    run_parser.add_argument('--latency-slo', type=float, default=30.0, help="p99 latency objective in seconds")
+    run_parser.add_argument('--error-budget', type=float, default=0.01,
+                            help="Highest error rate a sustained step may have")
+    run_parser.add_argument('--max-in-flight', type=int, default=256, help="Client-side concurrency cap")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--json', help="Write the full report to this file")
+    run_parser.add_argument('--csv', help="Write one row per rate step to this file")
+
+    for name, help_text in (('stub-ollama', "Serve a stubbed Ollama API"),
+                            ('stub-llama', "Write a stubbed llama-run executable")):
+        stub_parser = subcommands.add_parser(name, help=help_text)
+        stub_parser.add_argument('--latency', type=float, default=2.0, help="Mean generation time in seconds")
+        stub_parser.add_argument('--jitter', type=float, default=0.5, help="Standard deviation of the generation time")
+        stub_parser.add_argument('--bad-format-rate', type=float, default=0.05,
+                                 help="Fraction of responses without a GUESS line")
+        if name == 'stub-ollama':
+            stub_parser.add_argument('--port', type=int, default=11434)
+        else:
+            stub_parser.add_argument('--output', default=os.path.join('stub', 'llama-run'))
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        url = args.url or get_setting(
+            'PLAYER1_URL' if args.player == 'player1' else 'PLAYER2_URL',
+            f"http://localhost:{5001 if args.player == 'player1' else 5002}/get_guess"
+        )
+        generator = LoadGenerator(url, args.timeout, args.retry_fraction, args.arrivals,
+                                  args.max_in_flight, args.seed)
+        report = run_load_test(generator, args.rates, args.duration, args.latency_slo, args.error_budget)
+        print_table(report)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as json_file:
+                json.dump(report, json_file, indent=2)
+        if args.csv:
+            write_csv(report, args.csv)
+    elif args.command == 'stub-ollama':
+        serve_stub_ollama(args.port, args.latency, args.jitter, args.bad_format_rate)
+    else:
+        write_stub_llama(args.output, args.latency, args.jitter, args.bad_format_rate)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Opening book for the LLM Wordle players
+Built offline from the feedback-pattern table: for each opener it stores the
+turn-1 guess and, for every feedback pattern the opener can receive, the
+second guess that best splits the remaining words, each with a canned rationale.
+Players answer book positions in microseconds and only call the LLM off-book.
+
+Usage:
+    python opening_book.py build --openers CRANE SLATE
+    python opening_book.py show --opener CRANE
+"""
+
+import argparse
+import logging
+import mmap
+import os
+import struct
+from collections import Counter
+from typing import Dict, List, Any, Optional
+
+from config import get_setting
+from precomputed import dictionary_words, get_tables
+from wordle_logic import ALL_CORRECT_CODE, feedback_matrix, pack_feedback, unpack_feedback
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BOOK_PATH = os.path.join('assets', 'opening_book.bin')
+
+# File layout (little endian):
+#   header:  magic, opener count, word count
+#   words:   word count * 5 ASCII bytes
+#   openers: per opener, the opener word id and its turn-1 entry, then one
+#            entry per feedback code (243); an entry is word id, text offset, text length
+#   text:    UTF-8 rationales referenced by offset
+MAGIC = b'WDLBOOK1'
+HEADER = struct.Struct('<8sHH')
+ENTRY = struct.Struct('<HIH')
+OFF_BOOK = 0xFFFF
+FEEDBACK_CODES = 243
+OPENER_BLOCK = 2 + ENTRY.size * (1 + FEEDBACK_CODES)
+
+
+def best_follow_up(candidates: List[int], words: List[str], matrix: List[bytearray]) -> Dict[str, Any]:
+    """
+    Picks the guess that minimizes the expected number of words left,
+    preferring guesses that could themselves be the answer on ties
+    """
+    candidate_set = set(candidates)
+    best = None
+    for guess_id in range(len(words)):
+        row = matrix[guess_id]
+        groups = Counter(row[secret_id] for secret_id in candidates)
+        expected = sum(size * size for size in groups.values()) / len(candidates)
+        score = (expected, guess_id not in candidate_set, max(groups.values()))
+        if best is None or score < best['score']:
+            best = {'score': score, 'guess_id': guess_id, 'groups': len(groups), 'expected': expected}
+    return best
+
+
+def opener_rationale(opener: str) -> str:
+    vowels = ', '.join(sorted(set(letter for letter in opener if letter in 'AEIOU')))
+    consonants = ', '.join(sorted(set(letter for letter in opener if letter not in 'AEIOU')))
+    return (f"Fresh board, so I'm going with my favourite opener {opener}. It checks the vowels {vowels} "
+            f"and the common consonants {consonants} in one go. Straight out of my opening book!\n"
+            f"GUESS: {opener}")
+
+
+def follow_up_rationale(opener: str, feedback: str, candidates: List[str], guess: str,
+                        groups: int, expected: float) -> str:
+    if len(candidates) == 1:
+        return (f"{opener} came back {feedback}, and only one word fits that pattern. "
+                f"Time to close this out!\nGUESS: {guess}")
+    could_win = " and it could be the answer itself" if guess in candidates else ""
+    return (f"{opener} came back {feedback}, which leaves {len(candidates)} possible words. "
+            f"{guess} splits them into {groups} groups, leaving about {expected:.1f} on average{could_win}.\n"
+            f"GUESS: {guess}")
+
+
+def build_book(openers: List[str], output_path: str = DEFAULT_BOOK_PATH) -> Dict[str, Any]:
+    """Builds the book file for the given openers and returns a summary"""
+    secrets = dictionary_words()
+    openers = list(dict.fromkeys(opener.upper() for opener in openers))
+    for opener in openers:
+        if len(opener) != 5 or not opener.isalpha():
+            raise ValueError(f"Opener {opener} is not a 5-letter word")
+
+    # Secrets keep the first ids so candidate ids double as guess ids;
+    # openers outside the dictionary are appended as extra guesses
+    words = secrets + [opener for opener in openers if opener not in secrets]
+    word_ids = {word: word_id for word_id, word in enumerate(words)}
+
+    tables = get_tables()
+    if tables is not None:
+        # Reuse the precomputed rows and only compute the extra openers
+        matrix = [tables.row(i) for i in range(len(secrets))] + feedback_matrix(words[len(secrets):], secrets)
+    else:
+        logger.info(f"Building feedback-pattern table for {len(words)} guesses x {len(secrets)} secrets")
+        matrix = feedback_matrix(words, secrets)
+
+    text = bytearray()
+    blocks = bytearray()
+    summary = {}
+
+    def add_text(rationale: str):
+        encoded = rationale.encode('utf-8')
+        offset = len(text)
+        text.extend(encoded)
+        return offset, len(encoded)
+
+    for opener in openers:
+        opener_id = word_ids[opener]
+        blocks += struct.pack('<H', opener_id)
+        blocks += ENTRY.pack(opener_id, *add_text(opener_rationale(opener)))
+
+        partitions = {}
+        for secret_id, code in enumerate(matrix[opener_id]):
+            partitions.setdefault(code, []).append(secret_id)
+
+        for code in range(FEEDBACK_CODES):
+            candidates = partitions.get(code)
+            if not candidates or code == ALL_CORRECT_CODE:
+                blocks += ENTRY.pack(OFF_BOOK, 0, 0)
+                continue
+            best = best_follow_up(candidates, words, matrix)
+            guess = words[best['guess_id']]
+            rationale = follow_up_rationale(opener, unpack_feedback(code), [words[i] for i in candidates],
+                                            guess, best['groups'], best['expected'])
+            blocks += ENTRY.pack(best['guess_id'], *add_text(rationale))
+
+        summary[opener] = {'patterns': len(partitions) - (ALL_CORRECT_CODE in partitions)}
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'wb') as book_file:
+        book_file.write(HEADER.pack(MAGIC, len(openers), len(words)))
+        book_file.write(''.join(words).encode('ascii'))
+        book_file.write(blocks)
+        book_file.write(text)
+
+    return {
+        'path': output_path,
+        'words': len(words),
+        'secrets': len(secrets),
+        'openers': summary,
+        'bytes': os.path.getsize(output_path)
+    }
+
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped view of a book file
+    """
+
+    def __init__(self, path: str = DEFAULT_BOOK_PATH, opener: Optional[str] = None):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, opener_count, word_count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an opening book file")
+
+        self._words_offset = HEADER.size
+        self._word_count = word_count
+        self._blocks_offset = self._words_offset + 5 * word_count
+        self._text_offset = self._blocks_offset + opener_count * OPENER_BLOCK
+
+        # Opener word -> block offset
+        self._openers = {}
+        for index in range(opener_count):
+            block = self._blocks_offset + index * OPENER_BLOCK
+            (opener_id,) = struct.unpack_from('<H', self._data, block)
+            self._openers[self._word(opener_id)] = block
+
+        self.opener = (opener or next(iter(self._openers))).upper()
+        if self.opener not in self._openers:
+            raise ValueError(f"Opener {self.opener} is not in {path}; available: {', '.join(self._openers)}")
+
+    @property
+    def openers(self) -> List[str]:
+        return list(self._openers)
+
+    def _word(self, word_id: int) -> str:
+        start = self._words_offset + 5 * word_id
+        return self._data[start:start + 5].decode('ascii')
+
+    def _entry(self, block: int, slot: int) -> Optional[Dict[str, str]]:
+        word_id, offset, length = ENTRY.unpack_from(self._data, block + 2 + slot * ENTRY.size)
+        if word_id == OFF_BOOK:
+            return None
+        start = self._text_offset + offset
+        return {'word': self._word(word_id), 'rationale': self._data[start:start + length].decode('utf-8')}
+
+    def lookup(self, history: List[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """
+        Returns the book move for this history, or None once the game is off-book
+        """
+        if not history:
+            return self._entry(self._openers[self.opener], 0)
+
+        if len(history) == 1:
+            guess = str(history[0].get('guess', '')).upper()
+            block = self._openers.get(guess)
+            if block is None:
+                return None
+            try:
+                code = pack_feedback(history[0].get('feedback', ''))
+            except KeyError:
+                return None
+            return self._entry(block, 1 + code)
+
+        return None
+
+
+class BookMode:
+    """
+    Player-side switch for the opening book (PLAYER_BOOK_MODE)
+    """
+
+    def __init__(self, enabled: bool = False, path: str = DEFAULT_BOOK_PATH, opener: Optional[str] = None):
+        self.book = None
+        self.hits = 0
+        self.misses = 0
+        if enabled:
+            try:
+                self.book = OpeningBook(path, opener)
+                logger.info(f"Opening book loaded from {path} (opener {self.book.opener})")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Opening book disabled: {e}")
+
+    @classmethod
+    def from_env(cls) -> "BookMode":
+        """
+        PLAYER_BOOK_MODE=1 enables the book, PLAYER_OPENING_BOOK points at the
+        book file and PLAYER_BOOK_OPENER picks one of the openers it contains
+        """
+        return cls(
+            enabled=get_setting('PLAYER_BOOK_MODE', False, bool),
+            path=get_setting('PLAYER_OPENING_BOOK', DEFAULT_BOOK_PATH),
+            opener=get_setting('PLAYER_BOOK_OPENER')
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.book is not None
+
+    def lookup(self, history: List[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        if self.book is None:
+            return None
+        move = self.book.lookup(history)
+        if move is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return move
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'opener': self.book.opener if self.book else None,
+            'hits': self.hits,
+            'off_book': self.misses
+        }
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build or inspect the Wordle opening book")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subcommands.add_parser('build', help="Build the book from the dictionary")
+    build_parser.add_argument('--openers', nargs='+', default=['CRANE'], help="Turn-1 guesses to include")
+    build_parser.add_argument('--output', default=DEFAULT_BOOK_PATH, help="Book file to write")
+
+    show_parser = subcommands.add_parser('show', help="Print the book lines for one opener")
+    show_parser.add_argument('--opener', default=None, help="Opener to show (default: first in the book)")
+    show_parser.add_argument('--book', default=DEFAULT_BOOK_PATH, help="Book file to read")
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        print(build_book(args.openers, args.output))
+    else:
+        book = OpeningBook(args.book, args.opener)
+        print(f"Turn 1: {book.opener}")
+        for code in range(FEEDBACK_CODES):
+            move = book.lookup([{'guess': book.opener, 'feedback': unpack_feedback(code)}])
+            if move is not None:
+                print(f"  {unpack_feedback(code)} -> {move['word']}")
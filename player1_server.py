@@ -13,7 +13,25 @@ import random
 import logging
 import os
 import re
-from typing import Dict, List, Any
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+from admission_control import (
+    AdmissionController, AdmissionRejected, DeadlineExceeded,
+    deadline_from_headers, time_remaining
+)
+from circuit_breaker import CircuitBreaker
+from config import get_setting
+from llm_transcripts import LLMTranscripts
+from opening_book import BookMode
+from precomputed import get_tables
+from profiling import REQUEST_ID_HEADER, RequestProfiler, new_request_id
+from prompt_compaction import PromptCompactor
+from readiness import Readiness
+from sampling_strategies import (
+    FALLBACK_METHOD, FallbackResponse, GenerationCancelled, HedgedSampler, VotingSampler
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,8 +47,13 @@ class WordlePlayer:
     
     def __init__(self, player_name="Player 1"):
         self.player_name = player_name
-        self.llama_cpp_path = "/path/to/llama.cpp/build/bin/llama-run"  # Update this path
-        self.model_path = "/path/to/your/model.gguf"     # Update this path
+        self.llama_cpp_path = get_setting('LLAMA_CPP_PATH', "/path/to/llama.cpp/build/bin/llama-run")  # Update this path
+        self.model_path = get_setting('LLAMA_MODEL_PATH', "/path/to/your/model.gguf")     # Update this path
+        
+        self.call_timeout = get_setting('PLAYER_CALL_TIMEOUT', 45, float)  # Seconds allowed for a single generation
+        
+        # Fail fast with fallback responses while llama.cpp is unavailable
+        self.breaker = CircuitBreaker("llama.cpp", probe=self.probe_backend)
         
         # Common 5-letter words for fallback
         self.common_words = [
@@ -40,7 +63,32 @@ class WordlePlayer:
             "BREAD", "DREAM", "STEAM", "CREAM", "CLEAN", "CLEAR", "LEARN"
         ]
         
-    def construct_prompt(self, game_data: Dict[str, Any]) -> str:
+        # Record or replay LLM transcripts (WORDLE_LLM_MODE)
+        self.transcripts = LLMTranscripts.from_env("llama.cpp")
+        
+        # Token-budgeted prompts (PLAYER_PROMPT_MODE=compact), counted with llama.cpp's tokenizer
+        self.llama_tokenize_path = os.path.join(os.path.dirname(self.llama_cpp_path), "llama-tokenize")
+        self.compactor = PromptCompactor.from_env(self.count_tokens, "llama.cpp")
+        
+        # Precomputed answers for turns 1 and 2 (PLAYER_BOOK_MODE)
+        self.book = BookMode.from_env()
+        
+        # Optional hedged second sample, enabled with PLAYER_HEDGE_DELAY
+        self.sampler = HedgedSampler.from_env(
+            self.call_llama_cpp,
+            self.extract_word_from_response,
+            hedge_options={'temperature': 0.3},
+            extra_words=self.common_words
+        )
+        
+        # Optional k-sample voting (concurrent llama-run processes), enabled with PLAYER_VOTE_SAMPLES
+        self.voter = VotingSampler.from_env(
+            self.call_llama_cpp,
+            self.extract_word_from_response,
+            extra_words=self.common_words
+        )
+        
+    def construct_prompt(self, game_data: Dict[str, Any], deadline: Optional[float] = None) -> str:
         """
         Constructs a detailed prompt for the llama.cpp model
         """
@@ -49,6 +97,9 @@ class WordlePlayer:
         history = game_data.get('history', [])
         player_message = game_data.get('player_message', '')
         
+        if self.compactor.enabled:
+            return self.compactor.build(self.player_name, game_data, deadline)
+        
         prompt = f"""You are {self.player_name}, a contestant in a high-stakes Wordle game show. Be conversational, explain your thought process, and feel free to show some personality! You are competing against another AI.
 
 Game Rules:
@@ -87,55 +138,193 @@ GUESS: AUDIO"""
         
         return prompt
     
-    def call_llama_cpp(self, prompt: str) -> str:
+    def call_llama_cpp(self, prompt: str, deadline: Optional[float] = None, temperature: float = 0.8,
+                       cancel_event: Optional[threading.Event] = None) -> str:
         """
         Calls llama.cpp with the given prompt and returns the response
+        The call timeout is capped by the referee's deadline when one is given,
+        and the process is killed early if cancel_event is set
         """
+        options = {'temperature': temperature}
+        if self.transcripts.replaying:
+            # Serve recorded transcripts without touching llama.cpp
+            replayed = self.transcripts.replay(prompt, options, cancel_event)
+            return replayed if replayed is not None else self.generate_fallback_response()
+        
+        if not self.breaker.allow_request():
+            logger.warning("llama.cpp circuit is open, using fallback response")
+            return self.generate_fallback_response()
+        
+        if self.breaker.state == CircuitBreaker.HALF_OPEN:
+            # This is the half-open trial: it runs to completion so its outcome
+            # closes or reopens the circuit, even if another sample wins first
+            cancel_event = None
+        
+        started_at = time.monotonic()
+        timeout = self.call_timeout
+        remaining = time_remaining(deadline)
+        # True when the referee's deadline, not the backend, limits how long we wait
+        deadline_limited = remaining is not None and remaining < timeout
+        if remaining is not None:
+            timeout = max(min(timeout, remaining), 0.1)
         try:
+
             # Construct the llama.cpp command
             cmd = [
                 self.llama_cpp_path,
                 "-m", self.model_path,
                 "-p", prompt,
                 "-n", "200",  # Max tokens
-                "--temp", "0.8",
+                "--temp", str(temperature),
                 "--top-p", "0.9",
                 "-c", "2048"  # Context size
             ]
             
             # Execute the command
-            result = subprocess.run(
+            process = subprocess.Popen(
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=45  # 45 second timeout
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
             )
+            stdout, stderr = self.wait_for_process(process, timeout, cancel_event)
             
-            if result.returncode == 0:
-                return result.stdout.strip()
+            if process.returncode == 0:
+                latency = time.monotonic() - started_at
+                self.breaker.record_success(latency)
+                self.transcripts.record(prompt, options, stdout.strip(), latency)
+                return stdout.strip()
             else:
-                logger.error(f"llama.cpp error: {result.stderr}")
+                logger.error(f"llama.cpp error: {stderr}")
+                self.breaker.record_failure(f"exit code {process.returncode}", time.monotonic() - started_at)
                 return self.generate_fallback_response()
                 
+        except GenerationCancelled:
+            logger.info("llama.cpp call cancelled, another sample won")
+            return ""
         except subprocess.TimeoutExpired:
+            if deadline_limited:
+                # The caller ran out of time, which says nothing about the backend's health
+                logger.warning("llama.cpp call exceeded the referee's deadline")
+                self.breaker.release()
+                return self.generate_fallback_response()
             logger.error("llama.cpp call timed out")
+            self.breaker.record_failure("timeout", time.monotonic() - started_at)
             return self.generate_fallback_response()
         except Exception as e:
             logger.error(f"Error calling llama.cpp: {e}")
+            self.breaker.record_failure(str(e), time.monotonic() - started_at)
             return self.generate_fallback_response()
     
-    def generate_fallback_response(self) -> str:
+    def wait_for_process(self, process: subprocess.Popen, timeout: float,
+                         cancel_event: Optional[threading.Event] = None):
+        """
+        Waits for llama.cpp to finish, polling so a cancelled sample stops using the CPU
+        """
+        give_up_at = time.monotonic() + timeout
+        while True:
+            try:
+                return process.communicate(timeout=0.25)
+            except subprocess.TimeoutExpired:
+                cancelled = cancel_event is not None and cancel_event.is_set()
+                if cancelled or time.monotonic() >= give_up_at:
+                    process.kill()
+                    process.communicate()
+                    if cancelled:
+                        raise GenerationCancelled()
+                    raise
+    
+    def count_tokens(self, text: str, timeout: float = 10.0) -> int:
+        """
+        Counts tokens with llama.cpp's tokenizer (loads only the model vocabulary)
+        """
+        result = subprocess.run(
+            [self.llama_tokenize_path, "-m", self.model_path, "-p", text, "--ids", "--log-disable"],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"llama-tokenize failed: {result.stderr.strip()}")
+        return len(json.loads(result.stdout.strip().splitlines()[-1]))
+    
+    def preload_model(self):
+        """
+        Generates a single token so the model weights are read into the page cache
+        before the first turn, instead of during it
+        """
+        result = subprocess.run(
+            [self.llama_cpp_path, "-m", self.model_path, "-p", "Hello", "-n", "1", "-c", "2048"],
+            capture_output=True,
+            text=True,
+            timeout=self.call_timeout
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"llama.cpp exited with code {result.returncode}: {result.stderr.strip()[-200:]}")
+    
+    def warm_up(self, readiness: Readiness):
+        """
+        Loads everything the first request would otherwise pay for.
+        Called before the server reports ready.
+        """
+        readiness.plan(['tables', 'dictionary'] + (['opening_book'] if self.book.enabled else []) +
+                       ([] if self.transcripts.replaying else ['backend']) + ['model'])
+        
+        with readiness.step('tables'):
+            # Memory-maps the precomputed dictionary and feedback matrix if they were built
+            get_tables()
+        
+        with readiness.step('dictionary'):
+            if not self.sampler.dictionary:
+                raise RuntimeError("word list is empty")
+        
+        if self.book.enabled:
+            with readiness.step('opening_book'):
+                # Fault the opener and its follow-ups into memory
+                self.book.book.lookup([])
+        
+        if self.transcripts.replaying:
+            readiness.skip('model', 'replaying recorded transcripts')
+            return
+        
+        with readiness.step('backend'):
+            if not self.breaker.probe_now():
+                raise RuntimeError(f"llama.cpp or the model is missing ({self.llama_cpp_path}, {self.model_path})")
+        
+        if not self.breaker.status()['ready']:
+            readiness.skip('model', 'backend unavailable, serving fallback responses')
+        elif not get_setting('PLAYER_PRELOAD_MODEL', True, bool):
+            readiness.skip('model', 'disabled by PLAYER_PRELOAD_MODEL')
+        else:
+            with readiness.step('model'):
+                self.preload_model()
+    
+    def probe_backend(self) -> bool:
+        """
+        Cheap readiness check for llama.cpp: the binary and model must be present
+        """
+        return os.access(self.llama_cpp_path, os.X_OK) and os.path.isfile(self.model_path)
+    
+    def generate_fallback_response(self) -> FallbackResponse:
         """
         Generates a fallback response when llama.cpp is unavailable
         """
         word = random.choice(self.common_words)
-        return f"I guess {word}. Using fallback strategy as my AI system is having issues."
+        return FallbackResponse(word, f"I guess {word}. Using fallback strategy as my AI system is having issues.")
     
     def extract_word_from_response(self, raw_response: str) -> Dict[str, str]:
         """
         Extracts a 5-letter word from the LLM response using multiple strategies
         Priority: GUESS: format > other patterns > fallback
         """
+        if isinstance(raw_response, FallbackResponse):
+            return {
+                'word_guess': raw_response.word,
+                'comments': str(raw_response),
+                'raw_response': str(raw_response),
+                'parsing_method': FALLBACK_METHOD
+            }
+        
         try:
             # Strategy 1: Look for GUESS: format (highest priority)
             guess_pattern = r'GUESS:\s*([A-Z]{5})'
@@ -205,20 +394,53 @@ GUESS: AUDIO"""
                 'parsing_method': 'ERROR - fallback used'
             }
     
-    def get_guess(self, game_data: Dict[str, Any]) -> Dict[str, str]:
+    def get_book_move(self, game_data: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """
+        Answers early turns from the opening book when book mode is enabled.
+        Returns None once the position is off-book and the LLM has to play.
+        """
+        book_move = self.book.lookup(game_data.get('history', []))
+        if book_move is None:
+            return None
+        
+        logger.info(f"{self.player_name} played book move: {book_move['word']}")
+        return {
+            'word_guess': book_move['word'],
+            'comments': book_move['rationale'],
+            'raw_response': book_move['rationale'],
+            'parsing_method': 'Opening book'
+        }
+    
+    def get_guess(self, game_data: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, str]:
         """
         Main method to get a word guess from the LLM
+        Raises DeadlineExceeded if the referee has already given up on this request
         """
         logger.info(f"{self.player_name} generating guess for turn {game_data.get('turn_number', 1)}")
         
+        remaining = time_remaining(deadline)
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("Referee deadline passed before generation started")
+        
         # Construct the prompt
-        prompt = self.construct_prompt(game_data)
+        prompt = self.construct_prompt(game_data, deadline)
         
-        # Call llama.cpp
-        raw_response = self.call_llama_cpp(prompt)
+        if self.voter.enabled:
+            # Sample k guesses in parallel and keep the best-scoring, most voted one
+            parsed_response = self.voter.sample(prompt, game_data.get('history', []), deadline)
+        elif self.sampler.enabled:
+            # Race a more conservative hedge sample against the primary one
+            parsed_response = self.sampler.sample(prompt, game_data.get('history', []), deadline)
+        else:
+            # Call llama.cpp
+            raw_response = self.call_llama_cpp(prompt, deadline)
+            
+            # Extract word and comments
+            parsed_response = self.extract_word_from_response(raw_response)
         
-        # Extract word and comments
-        parsed_response = self.extract_word_from_response(raw_response)
+        parsed_response['prompt'] = self.compactor.report(prompt, deadline)
+        logger.info(f"{self.player_name} prompt for turn {game_data.get('turn_number', 1)}: "
+                    f"{parsed_response['prompt']['tokens']} tokens ({self.compactor.mode})")
         
         logger.info(f"{self.player_name} generated guess: {parsed_response['word_guess']}")
         return parsed_response
@@ -226,10 +448,40 @@ GUESS: AUDIO"""
 # Initialize the player
 player = WordlePlayer("Player 1")
 
+# Bound concurrent inference calls and queue depth (see admission_control.py)
+admission = AdmissionController.from_env()
+
+# Warm-up progress, reported by /ready
+readiness = Readiness("player1_server")
+
+# Opt-in per-request profiles (PROFILE_MODE, see profiling.py)
+profiler = RequestProfiler.from_env("player1_server")
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "player1_server", "player": "Player 1"})
+    backend = player.breaker.status()
+    return jsonify({
+        "status": "healthy" if backend['ready'] else "degraded",
+        "service": "player1_server",
+        "player": "Player 1",
+        "backend": backend
+    })
+
+@app.route('/ready', methods=['GET'])
+def ready_check():
+    """Readiness probe: 503 until warm-up has finished and again while draining"""
+    return jsonify(readiness.status()), 200 if readiness.is_ready else 503
+
+def drain(timeout: float) -> bool:
+    """
+    Stops admitting new guesses and waits for queued and running ones to finish.
+    Returns False if requests were still in flight after the timeout.
+    """
+    readiness.start_draining()
+    admission.start_draining()
+    logger.info(f"Draining Player 1 Server (up to {timeout}s)")
+    return admission.wait_until_idle(timeout)
 
 @app.route('/get_guess', methods=['POST'])
 def get_guess():
@@ -238,26 +490,62 @@ def get_guess():
     Expects JSON with game state information
     Returns JSON with word_guess and comments
     """
+    # The referee sends one ID per turn and attempt, so profiles can be matched to its turns
+    request_id = request.headers.get(REQUEST_ID_HEADER) or new_request_id()
+    
     try:
-        # Get the game data from the request
-        game_data = request.get_json()
-        
-        if not game_data:
-            return jsonify({"error": "No game data provided"}), 400
-        
-        # Generate the guess
-        response = player.get_guess(game_data)
-        
-        # Log the interaction
-        logger.info(f"Request: {game_data}")
-        logger.info(f"Response: {response}")
+        if readiness.warming_up:
+            raise AdmissionRejected(503, "Server is warming up", 1)
+        if readiness.failed:
+            raise AdmissionRejected(503, "Server failed to warm up, see /ready", 30)
         
-        return jsonify(response)
+        with profiler.profile(request_id):
+            # Get the game data from the request
+            game_data = request.get_json()
+            
+            if not game_data:
+                return jsonify({"error": "No game data provided"}), 400
+            
+            # Book positions are answered without taking an inference slot
+            response = player.get_book_move(game_data)
+            
+            if response is None:
+                # Wait for a free inference slot, bounded by the referee's deadline
+                deadline = deadline_from_headers(request.headers)
+                with admission.slot(deadline):
+                    response = player.get_guess(game_data, deadline)
+            
+            # Log the interaction
+            logger.info(f"Request {request_id}: {game_data}")
+            logger.info(f"Response {request_id}: {response}")
+            
+            return jsonify(response)
         
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected get_guess request: {e.reason}")
+        error_response = jsonify({"error": e.reason, "retry_after": e.retry_after})
+        error_response.headers['Retry-After'] = str(e.retry_after)
+        return error_response, e.status_code
+    except DeadlineExceeded as e:
+        logger.warning(f"Dropped get_guess request: {e}")
+        return jsonify({"error": str(e)}), 504
     except Exception as e:
         logger.error(f"Error in get_guess endpoint: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Queue depth, inference slot and sampling metrics"""
+    return jsonify({
+        "service": "player1_server",
+        "admission": admission.metrics(),
+        "sampling": player.sampler.metrics(),
+        "voting": player.voter.metrics(),
+        "transcripts": player.transcripts.metrics(),
+        "book": player.book.metrics(),
+        "profiling": profiler.metrics()
+    })
+
 @app.route('/', methods=['GET'])
 def index():
     """Simple index page for testing"""
@@ -279,5 +567,13 @@ if __name__ == '__main__':
         logger.warning(f"Model not found at {player.model_path}")
         logger.warning("Server will use fallback responses")
     
-    logger.info("Starting Player 1 Server on port 5001")
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    # Probe llama.cpp and load the model; /ready reports progress until it is done
+    readiness.start_warm_up(player.warm_up)
+    
+    # Development server; use `python serve.py player1` for production
+    host = get_setting('PLAYER1_HOST', '0.0.0.0')
+    port = get_setting('PLAYER1_PORT', 5001, int)
+    production = get_setting('PLAYER_SERVING_MODE', 'development') == 'production'
+    logger.info(f"Starting Player 1 Server on port {port} ({'production' if production else 'development'} mode)")
+    logger.info(f"Admission control: {admission.inference_slots} inference slot(s), queue of {admission.max_queue}")
+    app.run(host=host, port=port, debug=not production, threaded=True)
@@ -8,16 +8,43 @@ Provides word guessing functionality for the Wordle game
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import json
-import requests
 import random
 import logging
 import re
-from typing import Dict, List, Any
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+from admission_control import (
+    AdmissionController, AdmissionRejected, DeadlineExceeded,
+    deadline_from_headers, time_remaining
+)
+from circuit_breaker import CircuitBreaker
+from config import get_setting
+from llm_transcripts import LLMTranscripts
+from opening_book import BookMode
+from precomputed import get_tables
+from profiling import REQUEST_ID_HEADER, RequestProfiler, new_request_id
+from prompt_compaction import PromptCompactor
+from readiness import Readiness
+from sampling_strategies import (
+    FALLBACK_METHOD, FallbackResponse, GenerationCancelled, HedgedSampler, VotingSampler
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# JSON schema for constrained (hedge) samples, parsed by the JSON strategy below
+GUESS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "comments": {"type": "string"},
+        "word_guess": {"type": "string", "pattern": "^[A-Za-z]{5}$"}
+    },
+    "required": ["comments", "word_guess"]
+}
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
@@ -28,8 +55,14 @@ class WordlePlayer:
     
     def __init__(self, player_name="Player 2"):
         self.player_name = player_name
-        self.ollama_url = "http://localhost:11434/api/generate"
-        self.model_name = "gemma3:latest"  # Update this to your preferred model
+        self.ollama_url = get_setting('OLLAMA_URL', "http://localhost:11434/api/generate")
+        self.model_name = get_setting('OLLAMA_MODEL', "gemma3:latest")  # Update this to your preferred model
+        
+        self.call_timeout = get_setting('PLAYER_CALL_TIMEOUT', 45, float)  # Seconds allowed for a single generation
+        self.keep_alive = get_setting('OLLAMA_KEEP_ALIVE', '30m')  # How long Ollama keeps the model loaded
+        
+        # Fail fast with fallback responses while Ollama is unavailable
+        self.breaker = CircuitBreaker("ollama", probe=self.probe_backend)
         
         # Common 5-letter words for fallback
         self.common_words = [
@@ -39,7 +72,32 @@ class WordlePlayer:
             "BREAD", "DREAM", "STEAM", "CREAM", "CLEAN", "CLEAR", "LEARN"
         ]
         
-    def construct_prompt(self, game_data: Dict[str, Any]) -> str:
+        # Record or replay LLM transcripts (WORDLE_LLM_MODE)
+        self.transcripts = LLMTranscripts.from_env("ollama")
+        
+        # Token-budgeted prompts (PLAYER_PROMPT_MODE=compact); Ollama has no tokenizer endpoint,
+        # so token counts are estimated
+        self.compactor = PromptCompactor.from_env()
+        
+        # Precomputed answers for turns 1 and 2 (PLAYER_BOOK_MODE)
+        self.book = BookMode.from_env()
+        
+        # Optional hedged second sample, enabled with PLAYER_HEDGE_DELAY
+        self.sampler = HedgedSampler.from_env(
+            self.call_ollama,
+            self.extract_word_from_response,
+            hedge_options={'temperature': 0.3, 'constrained': True},
+            extra_words=self.common_words
+        )
+        
+        # Optional k-sample voting (concurrent Ollama requests), enabled with PLAYER_VOTE_SAMPLES
+        self.voter = VotingSampler.from_env(
+            self.call_ollama,
+            self.extract_word_from_response,
+            extra_words=self.common_words
+        )
+        
+    def construct_prompt(self, game_data: Dict[str, Any], deadline: Optional[float] = None) -> str:
         """
         Constructs a detailed prompt for the Ollama model
         """
@@ -48,6 +106,9 @@ class WordlePlayer:
         history = game_data.get('history', [])
         player_message = game_data.get('player_message', '')
         
+        if self.compactor.enabled:
+            return self.compactor.build(self.player_name, game_data, deadline)
+        
         prompt = f"""You are {self.player_name}, a contestant in a high-stakes Wordle game show. Be conversational, explain your thought process, and feel free to show some personality! You are competing against another AI.
 
 Game Rules:
@@ -88,54 +149,194 @@ GUESS: AUDIO"""
         
         return prompt
     
-    def call_ollama(self, prompt: str) -> str:
+    def call_ollama(self, prompt: str, deadline: Optional[float] = None, temperature: float = 0.8,
+                    constrained: bool = False, cancel_event: Optional[threading.Event] = None) -> str:
         """
         Calls Ollama with the given prompt and returns the response
+        The call timeout is capped by the referee's deadline when one is given.
+        With cancel_event the response is streamed so generation can be abandoned early,
+        and constrained=True asks Ollama for structured JSON output.
         """
+        # requests is imported on first use; it is a large share of startup time
+        import requests
+        options = {'temperature': temperature, 'constrained': constrained}
+        if self.transcripts.replaying:
+            # Serve recorded transcripts without touching Ollama
+            replayed = self.transcripts.replay(prompt, options, cancel_event)
+            return replayed if replayed is not None else self.generate_fallback_response()
+        
+        if not self.breaker.allow_request():
+            logger.warning("Ollama circuit is open, using fallback response")
+            return self.generate_fallback_response()
+        
+        if self.breaker.state == CircuitBreaker.HALF_OPEN:
+            # This is the half-open trial: it runs to completion so its outcome
+            # closes or reopens the circuit, even if another sample wins first
+            cancel_event = None
+        
+        started_at = time.monotonic()
+        timeout = self.call_timeout
+        remaining = time_remaining(deadline)
+        # True when the referee's deadline, not the backend, limits how long we wait
+        deadline_limited = remaining is not None and remaining < timeout
+        if remaining is not None:
+            timeout = max(min(timeout, remaining), 0.1)
         try:
+
             payload = {
                 "model": self.model_name,
                 "prompt": prompt,
-                "stream": False,
+                "stream": cancel_event is not None,
+                "keep_alive": self.keep_alive,
                 "options": {
-                    "temperature": 0.8,
+                    "temperature": temperature,
                     "top_p": 0.9,
                     "num_predict": 200
                 }
             }
+            if constrained:
+                payload["format"] = GUESS_SCHEMA
             
             response = requests.post(
                 self.ollama_url,
                 json=payload,
-                timeout=45
+                timeout=timeout,
+                stream=cancel_event is not None
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '').strip()
-            else:
-                logger.error(f"Ollama API error: {response.status_code} - {response.text}")
-                return self.generate_fallback_response()
+            with response:
+                if response.status_code == 200:
+                    if cancel_event is None:
+                        text = response.json().get('response', '')
+                    else:
+                        text = self.read_stream(response, cancel_event, started_at + timeout)
+                    latency = time.monotonic() - started_at
+                    self.breaker.record_success(latency)
+                    self.transcripts.record(prompt, options, text.strip(), latency)
+                    return text.strip()
+                else:
+                    logger.error(f"Ollama API error: {response.status_code} - {response.text}")
+                    self.breaker.record_failure(f"HTTP {response.status_code}", time.monotonic() - started_at)
+                    return self.generate_fallback_response()
                 
+        except GenerationCancelled:
+            logger.info("Ollama call cancelled, another sample won")
+            return ""
         except requests.exceptions.Timeout:
+            if deadline_limited:
+                # The caller ran out of time, which says nothing about the backend's health
+                logger.warning("Ollama call exceeded the referee's deadline")
+                self.breaker.release()
+                return self.generate_fallback_response()
             logger.error("Ollama API call timed out")
+            self.breaker.record_failure("timeout", time.monotonic() - started_at)
             return self.generate_fallback_response()
         except Exception as e:
             logger.error(f"Error calling Ollama: {e}")
+            self.breaker.record_failure(str(e), time.monotonic() - started_at)
             return self.generate_fallback_response()
     
-    def generate_fallback_response(self) -> str:
+    def read_stream(self, response, cancel_event: threading.Event, give_up_at: float) -> str:
+        """
+        Collects a streamed Ollama response; closing the connection early stops the generation
+        """
+        import requests
+        chunks = []
+        for line in response.iter_lines():
+            if cancel_event.is_set():
+                raise GenerationCancelled()
+            if time.monotonic() >= give_up_at:
+                raise requests.exceptions.Timeout("Ollama stream exceeded the call timeout")
+            if not line:
+                continue
+            chunk = json.loads(line)
+            chunks.append(chunk.get('response', ''))
+            if chunk.get('done'):
+                break
+        return ''.join(chunks)
+    
+    def preload_model(self):
+        """
+        Asks Ollama to load the model without generating anything, so the first
+        turn does not pay for loading the weights
+        """
+        import requests
+        response = requests.post(
+            self.ollama_url,
+            json={"model": self.model_name, "prompt": "", "keep_alive": self.keep_alive},
+            timeout=self.call_timeout
+        )
+        response.raise_for_status()
+    
+    def warm_up(self, readiness: Readiness):
+        """
+        Loads everything the first request would otherwise pay for.
+        Called before the server reports ready.
+        """
+        readiness.plan(['tables', 'dictionary'] + (['opening_book'] if self.book.enabled else []) +
+                       ([] if self.transcripts.replaying else ['backend']) + ['model'])
+        
+        with readiness.step('tables'):
+            # Memory-maps the precomputed dictionary and feedback matrix if they were built
+            get_tables()
+        
+        with readiness.step('dictionary'):
+            if not self.sampler.dictionary:
+                raise RuntimeError("word list is empty")
+        
+        if self.book.enabled:
+            with readiness.step('opening_book'):
+                # Fault the opener and its follow-ups into memory
+                self.book.book.lookup([])
+        
+        if self.transcripts.replaying:
+            readiness.skip('model', 'replaying recorded transcripts')
+            return
+        
+        with readiness.step('backend'):
+            if not self.breaker.probe_now():
+                raise RuntimeError(f"Ollama not reachable at {self.ollama_url} or model {self.model_name} not pulled")
+        
+        if not self.breaker.status()['ready']:
+            readiness.skip('model', 'backend unavailable, serving fallback responses')
+        elif not get_setting('PLAYER_PRELOAD_MODEL', True, bool):
+            readiness.skip('model', 'disabled by PLAYER_PRELOAD_MODEL')
+        else:
+            with readiness.step('model'):
+                self.preload_model()
+    
+    def probe_backend(self) -> bool:
+        """
+        Cheap readiness check for Ollama: the server must answer and list the configured model
+        """
+        import requests
+        tags_url = self.ollama_url.rsplit('/api/', 1)[0] + '/api/tags'
+        response = requests.get(tags_url, timeout=2)
+        if response.status_code != 200:
+            return False
+        models = [model.get('name') for model in response.json().get('models', [])]
+        return self.model_name in models
+    
+    def generate_fallback_response(self) -> FallbackResponse:
         """
         Generates a fallback response when Ollama is unavailable
         """
         word = random.choice(self.common_words)
-        return f"I guess {word}. Using fallback strategy as my AI system is having issues."
+        return FallbackResponse(word, f"I guess {word}. Using fallback strategy as my AI system is having issues.")
     
     def extract_word_from_response(self, raw_response: str) -> Dict[str, str]:
         """
         Extracts a 5-letter word from the LLM response using multiple strategies
         Priority: GUESS: format > other patterns > fallback
         """
+        if isinstance(raw_response, FallbackResponse):
+            return {
+                'word_guess': raw_response.word,
+                'comments': str(raw_response),
+                'raw_response': str(raw_response),
+                'parsing_method': FALLBACK_METHOD
+            }
+        
         try:
             # Strategy 1: Look for GUESS: format (highest priority)
             guess_pattern = r'GUESS:\s*([A-Z]{5})'
@@ -205,20 +406,53 @@ GUESS: AUDIO"""
                 'parsing_method': 'ERROR - fallback used'
             }
     
-    def get_guess(self, game_data: Dict[str, Any]) -> Dict[str, str]:
+    def get_book_move(self, game_data: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """
+        Answers early turns from the opening book when book mode is enabled.
+        Returns None once the position is off-book and the LLM has to play.
+        """
+        book_move = self.book.lookup(game_data.get('history', []))
+        if book_move is None:
+            return None
+        
+        logger.info(f"{self.player_name} played book move: {book_move['word']}")
+        return {
+            'word_guess': book_move['word'],
+            'comments': book_move['rationale'],
+            'raw_response': book_move['rationale'],
+            'parsing_method': 'Opening book'
+        }
+    
+    def get_guess(self, game_data: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, str]:
         """
         Main method to get a word guess from the LLM
+        Raises DeadlineExceeded if the referee has already given up on this request
         """
         logger.info(f"{self.player_name} generating guess for turn {game_data.get('turn_number', 1)}")
         
+        remaining = time_remaining(deadline)
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("Referee deadline passed before generation started")
+        
         # Construct the prompt
-        prompt = self.construct_prompt(game_data)
+        prompt = self.construct_prompt(game_data, deadline)
         
-        # Call Ollama
-        raw_response = self.call_ollama(prompt)
+        if self.voter.enabled:
+            # Sample k guesses in parallel and keep the best-scoring, most voted one
+            parsed_response = self.voter.sample(prompt, game_data.get('history', []), deadline)
+        elif self.sampler.enabled:
+            # Race a more conservative hedge sample against the primary one
+            parsed_response = self.sampler.sample(prompt, game_data.get('history', []), deadline)
+        else:
+            # Call Ollama
+            raw_response = self.call_ollama(prompt, deadline)
+            
+            # Extract word and comments
+            parsed_response = self.extract_word_from_response(raw_response)
         
-        # Extract word and comments
-        parsed_response = self.extract_word_from_response(raw_response)
+        parsed_response['prompt'] = self.compactor.report(prompt, deadline)
+        logger.info(f"{self.player_name} prompt for turn {game_data.get('turn_number', 1)}: "
+                    f"{parsed_response['prompt']['tokens']} tokens ({self.compactor.mode})")
         
         logger.info(f"{self.player_name} generated guess: {parsed_response['word_guess']}")
         return parsed_response
@@ -226,10 +460,40 @@ GUESS: AUDIO"""
 # Initialize the player
 player = WordlePlayer("Player 2")
 
+# Bound concurrent inference calls and queue depth (see admission_control.py)
+admission = AdmissionController.from_env()
+
+# Warm-up progress, reported by /ready
+readiness = Readiness("player2_server")
+
+# Opt-in per-request profiles (PROFILE_MODE, see profiling.py)
+profiler = RequestProfiler.from_env("player2_server")
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "player2_server", "player": "Player 2"})
+    backend = player.breaker.status()
+    return jsonify({
+        "status": "healthy" if backend['ready'] else "degraded",
+        "service": "player2_server",
+        "player": "Player 2",
+        "backend": backend
+    })
+
+@app.route('/ready', methods=['GET'])
+def ready_check():
+    """Readiness probe: 503 until warm-up has finished and again while draining"""
+    return jsonify(readiness.status()), 200 if readiness.is_ready else 503
+
+def drain(timeout: float) -> bool:
+    """
+    Stops admitting new guesses and waits for queued and running ones to finish.
+    Returns False if requests were still in flight after the timeout.
+    """
+    readiness.start_draining()
+    admission.start_draining()
+    logger.info(f"Draining Player 2 Server (up to {timeout}s)")
+    return admission.wait_until_idle(timeout)
 
 @app.route('/get_guess', methods=['POST'])
 def get_guess():
@@ -238,26 +502,62 @@ def get_guess():
     Expects JSON with game state information
     Returns JSON with word_guess and comments
     """
+    # The referee sends one ID per turn and attempt, so profiles can be matched to its turns
+    request_id = request.headers.get(REQUEST_ID_HEADER) or new_request_id()
+    
     try:
-        # Get the game data from the request
-        game_data = request.get_json()
-        
-        if not game_data:
-            return jsonify({"error": "No game data provided"}), 400
-        
-        # Generate the guess
-        response = player.get_guess(game_data)
-        
-        # Log the interaction
-        logger.info(f"Request: {game_data}")
-        logger.info(f"Response: {response}")
+        if readiness.warming_up:
+            raise AdmissionRejected(503, "Server is warming up", 1)
+        if readiness.failed:
+            raise AdmissionRejected(503, "Server failed to warm up, see /ready", 30)
         
-        return jsonify(response)
+        with profiler.profile(request_id):
+            # Get the game data from the request
+            game_data = request.get_json()
+            
+            if not game_data:
+                return jsonify({"error": "No game data provided"}), 400
+            
+            # Book positions are answered without taking an inference slot
+            response = player.get_book_move(game_data)
+            
+            if response is None:
+                # Wait for a free inference slot, bounded by the referee's deadline
+                deadline = deadline_from_headers(request.headers)
+                with admission.slot(deadline):
+                    response = player.get_guess(game_data, deadline)
+            
+            # Log the interaction
+            logger.info(f"Request {request_id}: {game_data}")
+            logger.info(f"Response {request_id}: {response}")
+            
+            return jsonify(response)
         
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected get_guess request: {e.reason}")
+        error_response = jsonify({"error": e.reason, "retry_after": e.retry_after})
+        error_response.headers['Retry-After'] = str(e.retry_after)
+        return error_response, e.status_code
+    except DeadlineExceeded as e:
+        logger.warning(f"Dropped get_guess request: {e}")
+        return jsonify({"error": str(e)}), 504
     except Exception as e:
         logger.error(f"Error in get_guess endpoint: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Queue depth, inference slot and sampling metrics"""
+    return jsonify({
+        "service": "player2_server",
+        "admission": admission.metrics(),
+        "sampling": player.sampler.metrics(),
+        "voting": player.voter.metrics(),
+        "transcripts": player.transcripts.metrics(),
+        "book": player.book.metrics(),
+        "profiling": profiler.metrics()
+    })
+
 @app.route('/', methods=['GET'])
 def index():
     """Simple index page for testing"""
@@ -270,5 +570,13 @@ def index():
     """
 
 if __name__ == '__main__':
-    logger.info("Starting Player 2 Server on port 5002")
-    app.run(host='0.0.0.0', port=5002, debug=True)
+    # Probe Ollama and load the model; /ready reports progress until it is done
+    readiness.start_warm_up(player.warm_up)
+    
+    # Development server; use `python serve.py player2` for production
+    host = get_setting('PLAYER2_HOST', '0.0.0.0')
+    port = get_setting('PLAYER2_PORT', 5002, int)
+    production = get_setting('PLAYER_SERVING_MODE', 'development') == 'production'
+    logger.info(f"Starting Player 2 Server on port {port} ({'production' if production else 'development'} mode)")
+    logger.info(f"Admission control: {admission.inference_slots} inference slot(s), queue of {admission.max_queue}")
+    app.run(host=host, port=port, debug=not production, threaded=True)
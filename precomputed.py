@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Precomputed Wordle tables for fast startup
+Serializes the dictionary and the feedback-pattern matrix (every dictionary
+guess against every dictionary secret) into one file that servers map into
+memory on first use instead of rebuilding at import time.
+
+Usage:
+    python precomputed.py build --openers CRANE    # tables and opening book
+    python precomputed.py info
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, List, FrozenSet, Any, Optional
+
+from config import get_setting
+from wordle_logic import WORD_LIST, feedback_code, feedback_matrix, pack_feedback
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TABLES_PATH = os.path.join('assets', 'tables.bin')
+
+# File layout (little endian):
+#   header: magic, word count, source digest of the WORD_LIST it was built from
+#   words:  word count * 5 ASCII bytes, sorted
+#   matrix: word count * word count feedback codes, one row per guess
+MAGIC = b'WDLTAB02'
+HEADER = struct.Struct('<8sI8s')
+
+
+def dictionary_words() -> List[str]:
+    """The sorted, valid 5-letter words of WORD_LIST"""
+    return sorted(set(word for word in WORD_LIST if len(word) == 5 and word.isalpha()))
+
+
+def source_digest() -> bytes:
+    """
+    Digest of WORD_LIST exactly as written, stored in the header so a stale file
+    is detected without sorting and filtering the word list at startup
+    """
+    return hashlib.blake2b(' '.join(WORD_LIST).encode('utf-8'), digest_size=8).digest()
+
+
+def build_tables(output_path: str = DEFAULT_TABLES_PATH) -> Dict[str, Any]:
+    """Writes the tables file for the current WORD_LIST and returns a summary"""
+    words = dictionary_words()
+    logger.info(f"Building feedback-pattern matrix for {len(words)} words")
+    matrix = feedback_matrix(words, words)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    temp_path = output_path + '.tmp'
+    with open(temp_path, 'wb') as tables_file:
+        tables_file.write(HEADER.pack(MAGIC, len(words), source_digest()))
+        tables_file.write(''.join(words).encode('ascii'))
+        for row in matrix:
+            tables_file.write(row)
+    os.replace(temp_path, output_path)
+
+    return {'path': output_path, 'words': len(words), 'bytes': os.path.getsize(output_path)}
+
+
+class WordTables:
+    """
+    Read-only, memory-mapped view of a tables file
+    """
+
+    def __init__(self, path: str = DEFAULT_TABLES_PATH):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, digest = HEADER.unpack_from(self._data, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a tables file")
+            expected_size = HEADER.size + 5 * count + count * count
+            if len(self._data) != expected_size:
+                raise ValueError(f"{path} is truncated or corrupt ({len(self._data)} bytes, expected {expected_size})")
+        except Exception:
+            self._file.close()
+            raise
+        self.count = count
+        self.digest = digest
+        self._words_offset = HEADER.size
+        self._matrix_offset = self._words_offset + 5 * count
+        self._words = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, word: str) -> bool:
+        return self.word_id(word) is not None
+
+    def word(self, word_id: int) -> str:
+        start = self._words_offset + 5 * word_id
+        return self._data[start:start + 5].decode('ascii')
+
+    @property
+    def words(self) -> List[str]:
+        if self._words is None:
+            raw = self._data[self._words_offset:self._matrix_offset].decode('ascii')
+            self._words = [raw[i:i + 5] for i in range(0, len(raw), 5)]
+        return self._words
+
+    def word_id(self, word: str) -> Optional[int]:
+        """Binary search over the sorted words, without decoding the whole list"""
+        key = word.upper().encode('ascii', 'replace')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = self._words_offset + 5 * middle
+            if self._data[start:start + 5] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.word(low) == word.upper():
+            return low
+        return None
+
+    def row(self, guess_id: int) -> bytes:
+        """Feedback codes of one guess against every secret"""
+        start = self._matrix_offset + guess_id * self.count
+        return self._data[start:start + self.count]
+
+    def candidates(self, history: List[Dict[str, str]]) -> List[str]:
+        """Dictionary words still consistent with every guess and its feedback"""
+        ids = range(self.count)
+        for entry in history:
+            guess = str(entry.get('guess', '')).upper()
+            if len(guess) != 5:
+                continue
+            try:
+                code = pack_feedback(entry.get('feedback', ''))
+            except KeyError:
+                continue
+            guess_id = self.word_id(guess)
+            if guess_id is not None:
+                row = self.row(guess_id)
+                ids = [i for i in ids if row[i] == code]
+            else:
+                ids = [i for i in ids if feedback_code(guess, self.word(i)) == code]
+        return [self.word(i) for i in ids]
+
+
+_tables = None
+_tables_loaded = False
+_tables_lock = threading.Lock()
+
+
+def get_tables() -> Optional[WordTables]:
+    """
+    Maps the tables file (WORDLE_TABLES, default assets/tables.bin) on first use.
+    Returns None when it is missing or was built from a different word list,
+    so callers fall back to computing feedback directly.
+    """
+    global _tables, _tables_loaded
+    with _tables_lock:
+        if not _tables_loaded:
+            _tables_loaded = True
+            path = get_setting('WORDLE_TABLES', DEFAULT_TABLES_PATH)
+            try:
+                tables = WordTables(path)
+                if tables.digest != source_digest():
+                    logger.warning(f"{path} was built from a different word list; "
+                                   f"rebuild it with `python precomputed.py build`")
+                else:
+                    _tables = tables
+            except FileNotFoundError:
+                logger.info(f"No precomputed tables at {path}, computing feedback on demand")
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"Ignoring precomputed tables, rebuild them with `python precomputed.py build`: {e}")
+        return _tables
+
+
+def load_dictionary() -> FrozenSet[str]:
+    """The dictionary as a set, from the mapped tables when available"""
+    tables = get_tables()
+    return frozenset(tables.words if tables is not None else dictionary_words())
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build or inspect the precomputed Wordle tables")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subcommands.add_parser('build', help="Build the tables and the opening book")
+    build_parser.add_argument('--output', default=DEFAULT_TABLES_PATH, help="Tables file to write")
+    build_parser.add_argument('--openers', nargs='*', default=['CRANE'],
+                              help="Openers for the opening book (none to skip the book)")
+
+    info_parser = subcommands.add_parser('info', help="Describe a tables file")
+    info_parser.add_argument('--tables', default=DEFAULT_TABLES_PATH, help="Tables file to read")
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        print(json.dumps(build_tables(args.output)))
+        if args.openers:
+            os.environ['WORDLE_TABLES'] = args.output
+            from opening_book import DEFAULT_BOOK_PATH, build_book
+            print(json.dumps(build_book(args.openers, get_setting('PLAYER_OPENING_BOOK', DEFAULT_BOOK_PATH))))
+    else:
+        tables = WordTables(args.tables)
+        print(json.dumps({
+            'path': args.tables,
+            'words': len(tables),
+            'bytes': os.path.getsize(args.tables),
+            'current': tables.digest == source_digest()
+        }))
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Opt-in request profiling for the LLM Wordle servers
+Profiles a random fraction of /get_guess requests (players) and turns
+(referee) and writes one collapsed-stack file per request, ready for
+flamegraph.pl, speedscope or inferno.
+
+Two modes:
+    sample  wall-clock stack sampling of the thread (or, under gevent and
+            eventlet, the greenlet) handling the request and of the hedge and
+            vote worker threads it starts, so time spent waiting on
+            llama.cpp/Ollama shows up next to prompt building, parsing and
+            JSON work
+    memory  tracemalloc snapshot of the allocations made while the request
+            ran, weighted by bytes. tracemalloc is process-wide, so one request
+            is traced at a time and allocations by other requests running
+            concurrently are included
+
+Usage:
+    PROFILE_MODE=sample PROFILE_RATE=0.05 python serve.py player1
+    flamegraph.pl profiles/player1_server-<request id>.folded > turn.svg
+"""
+
+import _thread
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Tuple, Any, Optional
+
+from config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Header used to correlate a referee turn with the player requests it made
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Deepest stack kept per sample
+MAX_STACK_DEPTH = 64
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def _os_threading():
+    """
+    Unpatched thread primitives (Thread, get_ident, allocate_lock, sleep), even
+    when gevent or eventlet has monkey-patched the standard library: the sampler
+    is a real OS thread and must keep running while greenlets are busy.
+    The last element is True when requests run in greenlets.
+    """
+    if 'gevent.monkey' in sys.modules:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            return (monkey.get_original('threading', 'Thread'), monkey.get_original('_thread', 'get_ident'),
+                    monkey.get_original('_thread', 'allocate_lock'), monkey.get_original('time', 'sleep'), True)
+    if 'eventlet.patcher' in sys.modules:
+        from eventlet import patcher
+        if patcher.is_monkey_patched('thread'):
+            real_thread = patcher.original('_thread')
+            return (patcher.original('threading').Thread, real_thread.get_ident,
+                    real_thread.allocate_lock, patcher.original('time').sleep, True)
+    return threading.Thread, _thread.get_ident, _thread.allocate_lock, time.sleep, False
+
+
+class StackSampler:
+    """
+    Background thread that samples the stacks of the threads being profiled.
+    A request's profile covers the thread that handles it plus any worker
+    threads attached to it (hedge and vote samples), whose stacks are rooted
+    under the worker's thread name.
+    Under gevent and eventlet every request shares the main OS thread, so the
+    profiled greenlet's own stack is sampled instead: gr_frame while it is
+    suspended, the thread's current frame while it is running.
+    It only runs while at least one request is being profiled.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._thread_class, self.get_ident, allocate_lock, self._sleep, self.green = _os_threading()
+        self._lock = allocate_lock()
+        # Profile key -> (counts, {member key: (thread id, greenlet or None, root label)})
+        self._targets: Dict[int, Tuple[Counter, Dict[int, Tuple[int, Any, Optional[str]]]]] = {}
+        self._labels = {}
+        self._running = False
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _stack(self, frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    def _run(self):
+        while True:
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._targets:
+                    self._running = False
+                    return
+                for counts, members in self._targets.values():
+                    for thread_id, task, root in members.values():
+                        if task is None:
+                            frame = frames.get(thread_id)
+                        else:
+                            frame = task.gr_frame
+                            if frame is None and not task.dead:
+                                frame = frames.get(thread_id)
+                        if frame is not None:
+                            stack = self._stack(frame)
+                            counts[f"{root};{stack}" if root else stack] += 1
+            del frames
+            self._sleep(self.interval)
+
+    def _member(self) -> Tuple[int, int, Any]:
+        """Key, OS thread id and greenlet (or None) of the calling thread"""
+        thread_id = self.get_ident()
+        task = None
+        if self.green:
+            from greenlet import getcurrent
+            task = getcurrent()
+        return (id(task) if task is not None else thread_id), thread_id, task
+
+    def start(self) -> int:
+        """Starts sampling the calling thread or greenlet and returns the key to stop it with"""
+        key, thread_id, task = self._member()
+        with self._lock:
+            self._targets[key] = (Counter(), {key: (thread_id, task, None)})
+            if not self._running:
+                self._running = True
+                self._thread_class(target=self._run, name="stack-sampler", daemon=True).start()
+        return key
+
+    def attach(self, key: int) -> Optional[int]:
+        """
+        Adds the calling worker thread to the profile started under key.
+        Returns the member key to detach with, or None if that profile has ended.
+        """
+        member, thread_id, task = self._member()
+        with self._lock:
+            target = self._targets.get(key)
+            if target is None or member in target[1]:
+                return None
+            target[1][member] = (thread_id, task, f"[{threading.current_thread().name}]")
+        return member
+
+    def detach(self, key: int, member: int):
+        with self._lock:
+            target = self._targets.get(key)
+            if target is not None:
+                target[1].pop(member, None)
+
+    def stop(self, key: int) -> Counter:
+        with self._lock:
+            target = self._targets.pop(key, None)
+        return target[0] if target is not None else Counter()
+
+
+# The sampler and key of the request being profiled on this thread, if any
+_current = threading.local()
+
+
+def current_profile() -> Optional[Tuple[StackSampler, int]]:
+    """
+    Handle for the sample-mode profile running on this thread. Pass it to
+    attach_profile in worker threads so their work shows up in the profile.
+    """
+    return getattr(_current, 'profile', None)
+
+
+@contextmanager
+def attach_profile(profile: Optional[Tuple[StackSampler, int]]):
+    """Samples the calling worker thread as part of profile until the block exits"""
+    if profile is None:
+        yield
+        return
+    sampler, key = profile
+    member = sampler.attach(key)
+    try:
+        yield
+    finally:
+        if member is not None:
+            sampler.detach(key, member)
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and writes their collapsed stacks
+    """
+
+    def __init__(self, service: str, mode: str = 'off', rate: float = 0.01,
+                 interval: float = 0.005, output_dir: str = 'profiles', memory_frames: int = 16):
+        self.service = service
+        self.mode = mode if mode in ('sample', 'memory') else 'off'
+        self.rate = rate
+        self.output_dir = output_dir
+        self.memory_frames = memory_frames
+        self.sampler = StackSampler(interval) if self.mode == 'sample' else None
+
+        self._lock = threading.Lock()
+        self._memory_lock = threading.Lock()
+        self.profiled = 0
+        self.last_path = None
+
+        if self.enabled:
+            logger.info(f"Profiling {rate:.1%} of {service} requests ({self.mode} mode) into {output_dir}")
+
+    @classmethod
+    def from_env(cls, service: str) -> "RequestProfiler":
+        """
+        PROFILE_MODE=sample|memory enables profiling, PROFILE_RATE is the fraction
+        of requests profiled (default 0.01), PROFILE_INTERVAL the sampling interval
+        in seconds (default 0.005) and PROFILE_DIR where profiles are written
+        """
+        return cls(
+            service,
+            mode=get_setting('PROFILE_MODE', 'off'),
+            rate=get_setting('PROFILE_RATE', 0.01, float),
+            interval=get_setting('PROFILE_INTERVAL', 0.005, float),
+            output_dir=get_setting('PROFILE_DIR', 'profiles')
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off' and self.rate > 0
+
+    @contextmanager
+    def profile(self, request_id: str):
+        """Profiles the block for a sampled fraction of calls; otherwise costs one random()"""
+        if not self.enabled or random.random() >= self.rate:
+            yield
+            return
+
+        started_at = time.monotonic()
+        if self.mode == 'sample':
+            key = self.sampler.start()
+            _current.profile = (self.sampler, key)
+            try:
+                yield
+            finally:
+                _current.profile = None
+                self._save(request_id, self.sampler.stop(key), 'folded', started_at)
+        elif not self._memory_lock.acquire(blocking=False):
+            # tracemalloc is process-wide; one memory profile at a time keeps
+            # another profiled request's allocations out of this one
+            yield
+        else:
+            try:
+                started_tracing = not tracemalloc.is_tracing()
+                if started_tracing:
+                    tracemalloc.start(self.memory_frames)
+                try:
+                    yield
+                finally:
+                    self._save(request_id, self._stop_tracing(started_tracing), 'alloc.folded', started_at)
+            finally:
+                self._memory_lock.release()
+
+    def _stop_tracing(self, stop: bool) -> Counter:
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        if stop:
+            tracemalloc.stop()
+
+        counts = Counter()
+        for stat in snapshot.statistics('traceback'):
+            stack = ';'.join(f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in stat.traceback)
+            counts[stack] += stat.size
+        return counts
+
+    def _save(self, request_id: str, counts: Counter, suffix: str, started_at: float):
+        safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', request_id)
+        path = os.path.join(self.output_dir, f"{self.service}-{safe_id}.{suffix}")
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as profile_file:
+                for stack, count in counts.most_common():
+                    profile_file.write(f"{stack} {count}\n")
+        except OSError as e:
+            logger.error(f"Could not write profile {path}: {e}")
+            return
+
+        with self._lock:
+            self.profiled += 1
+            self.last_path = path
+        logger.info(f"Saved {self.mode} profile for {request_id} "
+                    f"({sum(counts.values())} {'bytes' if self.mode == 'memory' else 'samples'}, "
+                    f"{time.monotonic() - started_at:.2f}s) to {path}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'rate': self.rate,
+            'profiled': self.profiled,
+            'last_profile': self.last_path
+        }
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Prompt compaction for the LLM Wordle players
+Summarizes the guess history into derived constraints (known greens, yellows
+and excluded letters) and keeps the prompt inside a token budget, so prompt
+evaluation time stays flat instead of growing every turn
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from admission_control import time_remaining
+from config import get_setting
+from wordle_logic import CORRECT, PRESENT
+
+logger = logging.getLogger(__name__)
+
+
+def derive_constraints(history: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Reduces previous guesses and feedback to what they imply about the secret word
+    """
+    greens = {}
+    yellows = {}
+    present = set()
+    absent = set()
+
+    for entry in history:
+        guess = str(entry.get('guess', '')).upper()
+        feedback = entry.get('feedback', '')
+        if len(guess) != 5 or len(feedback) != 5:
+            continue
+        for position, (letter, symbol) in enumerate(zip(guess, feedback)):
+            if symbol == CORRECT:
+                greens[position] = letter
+                present.add(letter)
+            elif symbol == PRESENT:
+                yellows.setdefault(letter, set()).add(position)
+                present.add(letter)
+            else:
+                absent.add(letter)
+
+    return {
+        'greens': greens,
+        'yellows': yellows,
+        # A gray letter may still be in the word if another copy was green or yellow
+        'excluded': sorted(absent - present),
+        'guessed': [str(entry.get('guess', '')).upper() for entry in history],
+    }
+
+
+def describe_constraints(constraints: Dict[str, Any]) -> str:
+    """Short natural-language summary of the derived constraints"""
+    pattern = ' '.join(constraints['greens'].get(position, '_') for position in range(5))
+    lines = [f"Known positions: {pattern}"]
+
+    if constraints['yellows']:
+        placed = []
+        for letter in sorted(constraints['yellows']):
+            positions = ', '.join(str(position + 1) for position in sorted(constraints['yellows'][letter]))
+            placed.append(f"{letter} (not position {positions})")
+        lines.append(f"In the word, wrong spot: {'; '.join(placed)}")
+
+    if constraints['excluded']:
+        lines.append(f"Not in the word: {', '.join(constraints['excluded'])}")
+
+    if constraints['guessed']:
+        lines.append(f"Already guessed: {', '.join(constraints['guessed'])}")
+
+    return '\n'.join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four UTF-8 bytes per token) used when no tokenizer is available"""
+    return max(1, math.ceil(len(text.encode('utf-8')) / 4))
+
+
+class PromptCompactor:
+    """
+    Builds compact prompts within a token budget. Each built prompt is measured
+    once with the model's tokenizer when one is available, falling back to an
+    estimate otherwise. Full-mode prompts are only ever estimated.
+    """
+
+    # Longest a single tokenizer call may take, before the referee's deadline is applied
+    TOKENIZER_TIMEOUT = 10.0
+    # Seconds to use estimates after a tokenizer failure, doubling up to MAX_BACKOFF
+    INITIAL_BACKOFF = 30.0
+    MAX_BACKOFF = 600.0
+
+    def __init__(self, mode: str = 'full', token_budget: int = 1024, recent_guesses: int = 2,
+                 count_tokens: Optional[Callable[..., int]] = None, tokenizer_name: str = 'model'):
+        self.mode = mode
+        self.token_budget = token_budget
+        self.recent_guesses = recent_guesses
+        self._count_tokens = count_tokens
+        self.tokenizer_name = tokenizer_name if count_tokens else 'estimate'
+
+        # Shared by concurrent requests and the hedge/vote sample threads
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._backoff = self.INITIAL_BACKOFF
+        self._retry_at = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode == 'compact'
+
+    @classmethod
+    def from_env(cls, count_tokens=None, tokenizer_name='model') -> "PromptCompactor":
+        """
+        PLAYER_PROMPT_MODE=compact enables compaction, PLAYER_PROMPT_TOKEN_BUDGET
+        sets the budget (default 1024 tokens) and PLAYER_PROMPT_RECENT_GUESSES how
+        many raw guess lines are kept next to the constraints (default 2)
+        """
+        return cls(
+            mode=get_setting('PLAYER_PROMPT_MODE', 'full'),
+            token_budget=get_setting('PLAYER_PROMPT_TOKEN_BUDGET', 1024, int),
+            recent_guesses=get_setting('PLAYER_PROMPT_RECENT_GUESSES', 2, int),
+            count_tokens=count_tokens,
+            tokenizer_name=tokenizer_name
+        )
+
+    def count(self, text: str, deadline: Optional[float] = None) -> Tuple[int, str]:
+        """
+        Returns (tokens, source). Uses the tokenizer unless it is backing off
+        after a failure or the deadline leaves no time for it; tokenizer counts
+        and the counts of built prompts are cached.
+        """
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+            backing_off = self._retry_at is not None and time.monotonic() < self._retry_at
+
+        timeout = self.TOKENIZER_TIMEOUT
+        remaining = time_remaining(deadline)
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        if self._count_tokens is None or backing_off or timeout <= 0:
+            return estimate_tokens(text), 'estimate'
+
+        try:
+            tokens = self._count_tokens(text, timeout=timeout)
+        except Exception as e:
+            with self._lock:
+                logger.warning(f"Tokenizer failed, estimating token counts for {self._backoff:.0f}s: {e}")
+                self._retry_at = time.monotonic() + self._backoff
+                self._backoff = min(self._backoff * 2, self.MAX_BACKOFF)
+            return estimate_tokens(text), 'estimate'
+
+        with self._lock:
+            self._backoff = self.INITIAL_BACKOFF
+            self._retry_at = None
+        self._remember(text, tokens, self.tokenizer_name)
+        return tokens, self.tokenizer_name
+
+    def _remember(self, text: str, tokens: int, source: str):
+        with self._lock:
+            self._cache[text] = (tokens, source)
+            if len(self._cache) > 256:
+                self._cache.popitem(last=False)
+
+    def build(self, player_name: str, game_data: Dict[str, Any], deadline: Optional[float] = None) -> str:
+        """
+        Compact prompt: a short persona and rules block, the derived constraints,
+        then up to recent_guesses of the latest guesses as long as they fit the budget.
+        The full prompt is tokenized once; if it is over budget, the oldest
+        guess lines are dropped using estimates scaled to that count.
+        """
+        turn_number = game_data.get('turn_number', 1)
+        max_turns = game_data.get('max_turns', 6)
+        history = game_data.get('history', [])
+        player_message = game_data.get('player_message', '')
+
+        header = f"""You are {player_name}, a contestant in a Wordle game show competing against another AI. Show some personality!
+Guess the secret 5-letter word. This is attempt {turn_number} of {max_turns}.
+Feedback: 🟩 right letter, right spot; 🟨 in the word, wrong spot; ⬜ not in the word.
+
+"""
+        if history:
+            knowledge = f"What you know so far:\n{describe_constraints(derive_constraints(history))}\n\n"
+        else:
+            knowledge = "This is your first turn. Open with a word that tests common vowels and consonants.\n\n"
+
+        footer = ""
+        if player_message:
+            footer += f"Game Message: {player_message}\n\n"
+        footer += """Briefly explain your reasoning, then on a separate line submit a valid 5-letter English word as `GUESS: YOURWORD`."""
+
+        recent_lines = [
+            f"Guess {i}: {history[i - 1].get('guess', '')} -> {history[i - 1].get('feedback', '')}\n"
+            for i in range(max(len(history) - self.recent_guesses, 0) + 1, len(history) + 1)
+        ]
+
+        def assemble(lines: List[str]) -> str:
+            recent = "Recent guesses:\n" + ''.join(lines) + "\n" if lines else ""
+            return header + knowledge + recent + footer
+
+        prompt = assemble(recent_lines)
+        tokens, source = self.count(prompt, deadline)
+        if tokens > self.token_budget and recent_lines:
+            # Drop the oldest guess lines, scaling their estimates by the measured prompt size
+            scale = tokens / estimate_tokens(prompt)
+            while recent_lines and tokens > self.token_budget:
+                tokens -= math.ceil(estimate_tokens(recent_lines.pop(0)) * scale)
+            prompt = assemble(recent_lines)
+            if source != 'estimate':
+                source = 'scaled'
+            # report() reuses this count instead of tokenizing the trimmed prompt again
+            self._remember(prompt, tokens, source)
+
+        if tokens > self.token_budget:
+            logger.warning(f"Compact prompt exceeds the {self.token_budget} token budget by {tokens - self.token_budget} tokens")
+
+        return prompt
+
+    def report(self, prompt: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Per-turn prompt size report attached to each response. Compact prompts
+        reuse the count made while building them; full prompts are estimated.
+        """
+        if self.enabled:
+            tokens, source = self.count(prompt, deadline)
+        else:
+            tokens, source = estimate_tokens(prompt), 'estimate'
+        return {
+            'mode': self.mode,
+            'tokens': tokens,
+            'budget': self.token_budget,
+            'tokenizer': source
+        }
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Readiness tracking for the LLM Wordle servers
+Each server runs named warm-up steps (loading the dictionary, the opening book,
+the model) before it reports ready, and reports not-ready again while draining.
+Warm-up runs in the background so /ready can report progress while it runs.
+A warm-up that fails leaves the server in a terminal 'failed' state.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Any
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class Readiness:
+    """
+    Warm-up progress and ready/draining state for one server process
+    """
+
+    def __init__(self, service: str):
+        self.service = service
+        self._lock = threading.Lock()
+        self._steps = {}
+        self._started = False
+        self._ready = False
+        self._failed = None
+        self._draining = False
+        self._created_at = time.monotonic()
+        self._ready_at = None
+
+    def plan(self, names: List[str]):
+        """Lists the warm-up steps up front so progress can be reported"""
+        with self._lock:
+            for name in names:
+                self._steps.setdefault(name, {'state': PENDING, 'seconds': None, 'error': None})
+
+    def start_warm_up(self, warm_up: Callable[["Readiness"], None]) -> threading.Thread:
+        """
+        Runs warm_up(self) in a background thread and marks the server ready
+        when it returns. A required step that fails marks the server failed;
+        it then never reports ready and has to be restarted.
+        """
+        with self._lock:
+            self._started = True
+
+        def run():
+            try:
+                warm_up(self)
+            except Exception as e:
+                logger.error(f"{self.service} warm-up failed, not reporting ready: {e}")
+                self.mark_failed(str(e))
+                return
+            self.mark_ready()
+
+        thread = threading.Thread(target=run, name=f"{self.service}-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def step(self, name: str, required: bool = False):
+        """
+        Times one warm-up step. A failed step is logged and reported but does not
+        block readiness unless it is required, since the players can still serve
+        fallback responses without a model.
+        """
+        started_at = time.monotonic()
+        with self._lock:
+            self._steps[name] = {'state': RUNNING, 'seconds': None, 'error': None}
+        logger.info(f"{self.service} warm-up: {name}")
+        try:
+            yield
+        except Exception as e:
+            self._finish(name, FAILED, started_at, str(e))
+            logger.warning(f"{self.service} warm-up step {name} failed: {e}")
+            if required:
+                raise
+        else:
+            self._finish(name, DONE, started_at)
+
+    def skip(self, name: str, reason: str):
+        with self._lock:
+            self._steps[name] = {'state': SKIPPED, 'seconds': 0.0, 'error': reason}
+
+    def _finish(self, name: str, state: str, started_at: float, error: str = None):
+        with self._lock:
+            self._steps[name] = {
+                'state': state,
+                'seconds': round(time.monotonic() - started_at, 3),
+                'error': error
+            }
+
+    def mark_ready(self):
+        with self._lock:
+            self._ready = True
+            self._ready_at = time.monotonic()
+        logger.info(f"{self.service} is ready after {self._ready_at - self._created_at:.2f}s")
+
+    def mark_failed(self, error: str):
+        with self._lock:
+            self._failed = error
+
+    def start_draining(self):
+        with self._lock:
+            self._draining = True
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready and not self._draining
+
+    @property
+    def warming_up(self) -> bool:
+        """True between start_warm_up and ready or failed; servers that never warm up are never gated"""
+        return self._started and not self._ready and self._failed is None
+
+    @property
+    def failed(self) -> bool:
+        return self._failed is not None
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._draining:
+                state = 'draining'
+            elif self._ready:
+                state = 'ready'
+            elif self._failed is not None:
+                state = 'failed'
+            else:
+                state = 'warming_up'
+            finished = sum(1 for step in self._steps.values() if step['state'] in (DONE, FAILED, SKIPPED))
+            current = [name for name, step in self._steps.items() if step['state'] == RUNNING]
+            return {
+                'service': self.service,
+                'status': state,
+                'ready': self._ready and not self._draining,
+                'error': self._failed,
+                'progress': {
+                    'finished': finished,
+                    'total': len(self._steps),
+                    'current': current[0] if current else None
+                },
+                'uptime_seconds': round(time.monotonic() - self._created_at, 3),
+                'startup_seconds': round(self._ready_at - self._created_at, 3) if self._ready_at else None,
+                'steps': {name: dict(step) for name, step in self._steps.items()}
+            }
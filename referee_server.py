@@ -14,7 +14,16 @@ import logging
 from logging.handlers import RotatingFileHandler
 import threading
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, FrozenSet, Any, Optional
+
+from admission_control import DEADLINE_HEADER
+from circuit_breaker import CircuitBreaker
+from config import get_setting
+from precomputed import get_tables, load_dictionary
+from profiling import REQUEST_ID_HEADER, RequestProfiler, new_request_id
+from readiness import Readiness
+from turn_records import TextStore, TurnLog, TurnRecord, WordTable
+from wordle_logic import ALL_CORRECT_CODE, WORD_LIST, evaluate_guess, feedback_code
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,9 +42,10 @@ fh.setFormatter(formatter)
 frontend_logger.addHandler(fh)
 
 app = Flask(__name__)
-app.config["SECRET_KEY"] = "your-secret-key-here-change-this"
+app.config["SECRET_KEY"] = get_setting('REFEREE_SECRET_KEY', "your-secret-key-here-change-this")
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+# REFEREE_ASYNC_MODE picks threading, gevent or eventlet (autodetected when unset, see serve.py)
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=get_setting('REFEREE_ASYNC_MODE'))
 
 class WordleGameMaster:
     """
@@ -43,63 +53,17 @@ class WordleGameMaster:
     """
     
     def __init__(self):
-        # Common 5-letter Wordle words
-        self.word_list = [
-            "ABOUT", "ABOVE", "ABUSE", "ACTOR", "ACUTE", "ADMIT", "ADOPT", "ADULT", "AFTER", "AGAIN",
-            "AGENT", "AGREE", "AHEAD", "ALARM", "ALBUM", "ALERT", "ALIEN", "ALIGN", "ALIKE", "ALIVE",
-            "ALLOW", "ALONE", "ALONG", "ALTER", "ANGEL", "ANGER", "ANGLE", "ANGRY", "APART", "APPLE",
-            "APPLY", "ARENA", "ARGUE", "ARISE", "ARRAY", "ASIDE", "ASSET", "AUDIO", "AUDIT", "AVOID",
-            "AWAKE", "AWARD", "AWARE", "BADLY", "BAKER", "BASES", "BASIC", "BEACH", "BEGAN", "BEGIN",
-            "BEING", "BELOW", "BENCH", "BILLY", "BIRTH", "BLACK", "BLAME", "BLANK", "BLAST", "BLIND",
-            "BLOCK", "BLOOD", "BOARD", "BOAST", "BOATS", "BOBBY", "BONDS", "BOOST", "BOOTH", "BOUND",
-            "BRAIN", "BRAND", "BRASS", "BRAVE", "BREAD", "BREAK", "BREED", "BRIEF", "BRING", "BROAD",
-            "BROKE", "BROWN", "BUILD", "BUILT", "BUYER", "CABLE", "CALIF", "CARRY", "CATCH", "CAUSE",
-            "CHAIN", "CHAIR", "CHAOS", "CHARM", "CHART", "CHASE", "CHEAP", "CHECK", "CHEST", "CHIEF",
-            "CHILD", "CHINA", "CHOSE", "CIVIL", "CLAIM", "CLASS", "CLEAN", "CLEAR", "CLICK", "CLIMB",
-            "CLOCK", "CLOSE", "CLOUD", "COACH", "COAST", "COULD", "COUNT", "COURT", "COVER", "CRAFT",
-            "CRANE", "CRASH", "CRAZY", "CREAM", "CRIME", "CROSS", "CROWD", "CROWN", "CRUDE", "CURVE",
-            "CYCLE", "DAILY", "DANCE", "DATED", "DEALT", "DEATH", "DEBUT", "DELAY", "DEPTH", "DOING",
-            "DOUBT", "DOZEN", "DRAFT", "DRAMA", "DRANK", "DREAM", "DRESS", "DRILL", "DRINK", "DRIVE",
-            "DROVE", "DYING", "EAGER", "EARLY", "EARTH", "EIGHT", "ELITE", "EMPTY", "ENEMY", "ENJOY",
-            "ENTER", "ENTRY", "EQUAL", "ERROR", "EVENT", "EVERY", "EXACT", "EXIST", "EXTRA", "FAITH",
-            "FALSE", "FAULT", "FIBER", "FIELD", "FIFTH", "FIFTY", "FIGHT", "FINAL", "FIRST", "FIXED",
-            "FLASH", "FLEET", "FLOOR", "FLUID", "FOCUS", "FORCE", "FORTH", "FORTY", "FORUM", "FOUND",
-            "FRAME", "FRANK", "FRAUD", "FRESH", "FRONT", "FRUIT", "FULLY", "FUNNY", "GIANT", "GIVEN",
-            "GLASS", "GLOBE", "GOING", "GRACE", "GRADE", "GRAND", "GRANT", "GRASS", "GRAVE", "GREAT",
-            "GREEN", "GROSS", "GROUP", "GROWN", "GUARD", "GUESS", "GUEST", "GUIDE", "HAPPY", "HARRY",
-            "HEART", "HEAVY", "HENCE", "HENRY", "HORSE", "HOTEL", "HOUSE", "HUMAN", "IDEAL", "IMAGE",
-            "INDEX", "INNER", "INPUT", "ISSUE", "JAPAN", "JIMMY", "JOINT", "JONES", "JUDGE", "KNOWN",
-            "LABEL", "LARGE", "LASER", "LATER", "LAUGH", "LAYER", "LEARN", "LEASE", "LEAST", "LEAVE",
-            "LEGAL", "LEVEL", "LEWIS", "LIGHT", "LIMIT", "LINKS", "LIVES", "LOCAL", "LOOSE", "LOWER",
-            "LUCKY", "LUNCH", "LYING", "MAGIC", "MAJOR", "MAKER", "MARCH", "MARIA", "MATCH", "MAYBE",
-            "MAYOR", "MEANT", "MEDIA", "METAL", "MIGHT", "MINOR", "MINUS", "MIXED", "MODEL", "MONEY",
-            "MONTH", "MORAL", "MOTOR", "MOUNT", "MOUSE", "MOUTH", "MOVED", "MOVIE", "MUSIC", "NEEDS",
-            "NEVER", "NEWLY", "NIGHT", "NOISE", "NORTH", "NOTED", "NOVEL", "NURSE", "OCCUR", "OCEAN",
-            "OFFER", "OFTEN", "ORDER", "OTHER", "OUGHT", "PAINT", "PANEL", "PAPER", "PARTY", "PEACE",
-            "PETER", "PHASE", "PHONE", "PHOTO", "PIANO", "PICKED", "PIECE", "PILOT", "PITCH", "PLACE",
-            "PLAIN", "PLANE", "PLANT", "PLATE", "POINT", "POUND", "POWER", "PRESS", "PRICE", "PRIDE",
-            "PRIME", "PRINT", "PRIOR", "PRIZE", "PROOF", "PROUD", "PROVE", "QUEEN", "QUICK", "QUIET",
-            "QUITE", "RADIO", "RAISE", "RANGE", "RAPID", "RATIO", "REACH", "READY", "REALM", "REBEL",
-            "REFER", "RELAX", "REPAY", "REPLY", "RIGHT", "RIGID", "RIVAL", "RIVER", "ROBIN", "ROGER",
-            "ROMAN", "ROUGH", "ROUND", "ROUTE", "ROYAL", "RURAL", "SCALE", "SCENE", "SCOPE", "SCORE",
-            "SENSE", "SERVE", "SEVEN", "SHALL", "SHAPE", "SHARE", "SHARP", "SHEET", "SHELF", "SHELL",
-            "SHIFT", "SHINE", "SHIRT", "SHOCK", "SHOOT", "SHORT", "SHOWN", "SIGHT", "SILLY", "SINCE",
-            "SIXTH", "SIXTY", "SIZED", "SKILL", "SLEEP", "SLIDE", "SMALL", "SMART", "SMILE", "SMITH",
-            "SMOKE", "SOLID", "SOLVE", "SORRY", "SOUND", "SOUTH", "SPACE", "SPARE", "SPEAK", "SPEED",
-            "SPEND", "SPENT", "SPLIT", "SPOKE", "SPORT", "STAFF", "STAGE", "STAKE", "STAND", "START",
-            "STATE", "STEAM", "STEEL", "STEEP", "STEER", "STICK", "STILL", "STOCK", "STONE", "STOOD",
-            "STORE", "STORM", "STORY", "STRIP", "STUCK", "STUDY", "STUFF", "STYLE", "SUGAR", "SUITE",
-            "SUPER", "SWEET", "TABLE", "TAKEN", "TASTE", "TAXES", "TEACH", "TEAMS", "TEETH", "TERRY",
-            "TEXAS", "THANK", "THEFT", "THEIR", "THEME", "THERE", "THESE", "THICK", "THING", "THINK",
-            "THIRD", "THOSE", "THREE", "THREW", "THROW", "THUMB", "TIGHT", "TIRED", "TITLE", "TODAY",
-            "TOPIC", "TOTAL", "TOUCH", "TOUGH", "TOWER", "TRACK", "TRADE", "TRAIN", "TREAT", "TREND",
-            "TRIAL", "TRIBE", "TRICK", "TRIED", "TRIES", "TRUCK", "TRULY", "TRUNK", "TRUST", "TRUTH",
-            "TWICE", "UNCLE", "UNDUE", "UNION", "UNITY", "UNTIL", "UPPER", "UPSET", "URBAN", "USAGE",
-            "USUAL", "VALID", "VALUE", "VIDEO", "VIRUS", "VISIT", "VITAL", "VOCAL", "VOICE", "WASTE",
-            "WATCH", "WATER", "WHEEL", "WHERE", "WHICH", "WHILE", "WHITE", "WHOLE", "WHOSE", "WOMAN",
-            "WOMEN", "WORLD", "WORRY", "WORSE", "WORST", "WORTH", "WOULD", "WRITE", "WRONG", "WROTE",
-            "YOUNG", "YOUTH"
-        ]
+        # Common 5-letter Wordle words, shared with the players; the list is
+        # kept for secret selection and turn-record word ids
+        self.word_list = list(WORD_LIST)
+        self._dictionary = None
+    
+    @property
+    def dictionary(self) -> FrozenSet[str]:
+        """Valid words as a set, from the memory-mapped tables when they were built"""
+        if self._dictionary is None:
+            self._dictionary = load_dictionary()
+        return self._dictionary
     
     def choose_secret_word(self) -> str:
         """Choose a random secret word for the game"""
@@ -112,32 +76,15 @@ class WordleGameMaster:
         🟨 = correct letter in wrong position
         ⬜ = letter not in word
         """
-        if len(guess) != 5 or len(secret_word) != 5:
-            return "⬜⬜⬜⬜⬜"  # Invalid guess
-        
-        guess = guess.upper()
-        secret_word = secret_word.upper()
-        
-        feedback = ['⬜'] * 5
-        secret_chars = list(secret_word)
-        
-        # First pass: mark exact matches
-        for i in range(5):
-            if guess[i] == secret_word[i]:
-                feedback[i] = '🟩'
-                secret_chars[i] = None  # Mark as used
-        
-        # Second pass: mark partial matches
-        for i in range(5):
-            if feedback[i] == '⬜' and guess[i] in secret_chars:
-                feedback[i] = '🟨'
-                # Remove the first occurrence of this character
-                secret_chars[secret_chars.index(guess[i])] = None
-        
-        return ''.join(feedback)
+        return evaluate_guess(guess, secret_word)
+    
+    def score_guess(self, guess: str, secret_word: str) -> int:
+        """Same as evaluate_guess, but returns the feedback packed as a base-3 integer"""
+        return feedback_code(guess, secret_word)
+    
     def is_valid_word(self, word: str) -> bool:
         """Check if a word is valid (5 letters, alphabetic)"""
-        return len(word) == 5 and word.isalpha() and word.upper() in self.word_list
+        return len(word) == 5 and word.isalpha() and word.upper() in self.dictionary
 
 class WordleReferee:
     """
@@ -146,9 +93,28 @@ class WordleReferee:
     
     def __init__(self):
         self.game_master = WordleGameMaster()
-        self.player1_url = "http://localhost:5001/get_guess"
-        self.player2_url = "http://localhost:5002/get_guess"
-        self.request_timeout = 120  # Timeout in seconds for player requests
+        self.player1_url = get_setting('PLAYER1_URL', "http://localhost:5001/get_guess")
+        self.player2_url = get_setting('PLAYER2_URL', "http://localhost:5002/get_guess")
+        self.request_timeout = get_setting('REFEREE_REQUEST_TIMEOUT', 120, float)  # Timeout in seconds for player requests
+        self.max_backoff = 30  # Upper bound on Retry-After waits when a player is saturated
+        self.turn_pause = get_setting('REFEREE_TURN_PAUSE', 2.0, float)  # Seconds between turns
+        
+        # One breaker per player server so an outage fails fast instead of waiting out every retry
+        self.player_breakers = {
+            url: CircuitBreaker(name, probe=lambda url=url: self.probe_player(url))
+            for url, name in ((self.player1_url, "Player 1"), (self.player2_url, "Player 2"))
+        }
+        
+        # Compact turn storage for the current game, cleared by reset_game (see turn_records.py)
+        text_budget = get_setting('REFEREE_TEXT_STORE_BYTES', 1024 * 1024, int)
+        self.turn_log = TurnLog(WordTable(self.game_master.word_list), TextStore(max_bytes=text_budget))
+        
+        # Opt-in per-turn profiles (PROFILE_MODE, see profiling.py)
+        self.profiler = RequestProfiler.from_env("referee_server")
+        
+        # Set to False while draining so no new game is started before shutdown
+        self.accepting_games = True
+        self.game_thread: Optional[threading.Thread] = None
         
         # Game state
         self.reset_game()
@@ -156,12 +122,14 @@ class WordleReferee:
     def reset_game(self):
         """Reset the game state for a new game"""
         self.secret_word = None
+        self.game_id = new_request_id()
         self.current_turn = 0
         self.max_turns = 6
         self.game_over = False
         self.winner = None
-        self.player1_history = []
-        self.player2_history = []
+        self.player1_history: List[TurnRecord] = []
+        self.player2_history: List[TurnRecord] = []
+        self.turn_log.clear()
         self.game_log = []
     
     def start_new_game(self):
@@ -183,7 +151,14 @@ class WordleReferee:
         """Get a guess from a player LLM with retry logic for format errors"""
         max_retries = 2
         
+        breaker = self.player_breakers[player_url]
+        
         for attempt in range(max_retries + 1):
+            if not breaker.allow_request():
+                logger.error(f"{player_name} circuit is open, skipping request")
+                return None
+            
+            started_at = time.monotonic()
             try:
                 game_data = {
                     'turn_number': self.current_turn,
@@ -196,7 +171,21 @@ class WordleReferee:
                 if attempt > 0:
                     game_data['player_message'] += f' [RETRY {attempt}/{max_retries}] Please use the format: GUESS: YOURWORD'
                 
-                response = requests.post(player_url, json=game_data, timeout=self.request_timeout)
+                # Tell the player how long we will wait so it can drop work we have given up on,
+                # and tag the request so player profiles can be matched to this turn
+                request_id = f"{self.game_id}-turn{self.current_turn}-{player_name.replace(' ', '').lower()}-{attempt}"
+                response = requests.post(
+                    player_url,
+                    json=game_data,
+                    headers={DEADLINE_HEADER: str(self.request_timeout), REQUEST_ID_HEADER: request_id},
+                    timeout=self.request_timeout
+                )
+                
+                # Backpressure (429/503) means the player is alive, only other 5xx count as failures
+                if response.status_code >= 500 and response.status_code != 503:
+                    breaker.record_failure(f"HTTP {response.status_code}", time.monotonic() - started_at)
+                else:
+                    breaker.record_success(time.monotonic() - started_at)
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -217,17 +206,51 @@ class WordleReferee:
                 else:
                     logger.error(f"Error from {player_name}: {response.status_code}")
                     if attempt < max_retries:
+                        if response.status_code in (429, 503):
+                            backoff = self.get_retry_after(response)
+                            logger.warning(f"{player_name} is saturated, backing off for {backoff}s")
+                            time.sleep(backoff)
                         continue
                     return None
                     
             except Exception as e:
                 logger.error(f"Error getting guess from {player_name} (attempt {attempt + 1}): {e}")
+                breaker.record_failure(str(e), time.monotonic() - started_at)
                 if attempt < max_retries:
                     continue
                 return None
         
         return None
     
+    def probe_player(self, player_url: str) -> bool:
+        """
+        Background probe used by the circuit breaker: the player's /ready must
+        return 200. A player that is still warming up or draining answers /health
+        but rejects /get_guess, so it does not count as up.
+        """
+        ready_url = player_url.rsplit('/', 1)[0] + '/ready'
+        return requests.get(ready_url, timeout=2).status_code == 200
+    
+    def unready_players(self) -> List[str]:
+        """Names of the players whose /ready does not return 200 right now"""
+        unready = []
+        for url, breaker in self.player_breakers.items():
+            try:
+                ready = self.probe_player(url)
+            except requests.RequestException:
+                ready = False
+            if not ready:
+                unready.append(breaker.name)
+        return unready
+    
+    def get_retry_after(self, response) -> float:
+        """Reads the Retry-After header from a saturated player, capped at max_backoff"""
+        try:
+            retry_after = float(response.headers.get('Retry-After', 1))
+        except (TypeError, ValueError):
+            retry_after = 1
+        return min(max(retry_after, 0), self.max_backoff)
+    
     def process_turn(self):
         """Process one turn of the game for both players"""
         if self.game_over:
@@ -243,64 +266,48 @@ class WordleReferee:
         })
         
         # Get guesses from both players simultaneously
-        player1_response = self.get_player_guess(self.player1_url, "Player 1", self.player1_history)
-        player2_response = self.get_player_guess(self.player2_url, "Player 2", self.player2_history)
+        player1_response = self.get_player_guess(self.player1_url, "Player 1", self.turn_log.history_wire(self.player1_history))
+        player2_response = self.get_player_guess(self.player2_url, "Player 2", self.turn_log.history_wire(self.player2_history))
         
         # Process Player 1
         if player1_response:
             guess1 = player1_response.get('word_guess', '').upper()
-            comments1 = player1_response.get('comments', '')
-            raw_response1 = player1_response.get('raw_response', '')
-            parsing_method1 = player1_response.get('parsing_method', 'Unknown')
-            feedback1 = self.game_master.evaluate_guess(guess1, self.secret_word)
-            
-            self.player1_history.append({
-                'guess': guess1,
-                'feedback': feedback1
-            })
+            record1 = self.turn_log.record(
+                self.current_turn,
+                guess1,
+                self.game_master.score_guess(guess1, self.secret_word),
+                player1_response.get('comments', ''),
+                player1_response.get('raw_response', ''),
+                player1_response.get('parsing_method', 'Unknown')
+            )
+            self.player1_history.append(record1)
             
             # Emit Player 1 turn
-            socketio.emit('player_turn', {
-                'player': 'Player 1',
-                'turn': self.current_turn,
-                'guess': guess1,
-                'feedback': feedback1,
-                'comments': comments1,
-                'raw_response': raw_response1,
-                'parsing_method': parsing_method1
-            })
+            socketio.emit('player_turn', {'player': 'Player 1', **self.turn_log.turn_wire(record1)})
             
             # Check if Player 1 won
-            if feedback1 == '🟩🟩🟩🟩🟩':
+            if record1.feedback == ALL_CORRECT_CODE:
                 self.game_over = True
                 self.winner = 'Player 1'
         
         # Process Player 2
         if player2_response:
             guess2 = player2_response.get('word_guess', '').upper()
-            comments2 = player2_response.get('comments', '')
-            raw_response2 = player2_response.get('raw_response', '')
-            parsing_method2 = player2_response.get('parsing_method', 'Unknown')
-            feedback2 = self.game_master.evaluate_guess(guess2, self.secret_word)
-            
-            self.player2_history.append({
-                'guess': guess2,
-                'feedback': feedback2
-            })
+            record2 = self.turn_log.record(
+                self.current_turn,
+                guess2,
+                self.game_master.score_guess(guess2, self.secret_word),
+                player2_response.get('comments', ''),
+                player2_response.get('raw_response', ''),
+                player2_response.get('parsing_method', 'Unknown')
+            )
+            self.player2_history.append(record2)
             
             # Emit Player 2 turn
-            socketio.emit('player_turn', {
-                'player': 'Player 2',
-                'turn': self.current_turn,
-                'guess': guess2,
-                'feedback': feedback2,
-                'comments': comments2,
-                'raw_response': raw_response2,
-                'parsing_method': parsing_method2
-            })
+            socketio.emit('player_turn', {'player': 'Player 2', **self.turn_log.turn_wire(record2)})
             
             # Check if Player 2 won
-            if feedback2 == '🟩🟩🟩🟩🟩':
+            if record2.feedback == ALL_CORRECT_CODE:
                 if self.winner == 'Player 1':
                     self.winner = 'Tie'  # Both guessed correctly on same turn
                 else:
@@ -319,19 +326,53 @@ class WordleReferee:
                 'winner': self.winner,
                 'secret_word': self.secret_word,
                 'total_turns': self.current_turn,
-                'player1_history': self.player1_history,
-                'player2_history': self.player2_history
+                'player1_history': self.turn_log.history_wire(self.player1_history),
+                'player2_history': self.turn_log.history_wire(self.player2_history)
             })
     
+    def warm_up(self, readiness: Readiness):
+        """Loads the dictionary and probes both players before the referee reports ready"""
+        readiness.plan(['tables', 'dictionary', 'players'])
+        with readiness.step('tables'):
+            # Memory-maps the precomputed dictionary and feedback matrix if they were built
+            get_tables()
+        
+        with readiness.step('dictionary', required=True):
+            if not self.game_master.dictionary:
+                raise RuntimeError("word list is empty")
+        
+        # Players may start after the referee; their breakers keep probing in the background
+        with readiness.step('players'):
+            unreachable = [breaker.name for breaker in self.player_breakers.values() if not breaker.probe_now()]
+            if unreachable:
+                raise RuntimeError(f"{', '.join(unreachable)} not reachable yet, probing in the background")
+    
+    def drain(self, timeout: float) -> bool:
+        """
+        Stops accepting new games and waits for the running game to finish.
+        Returns False if the game was still running after the timeout.
+        """
+        self.accepting_games = False
+        game_thread = self.game_thread
+        if game_thread is None or not game_thread.is_alive():
+            return True
+        logger.info(f"Waiting up to {timeout}s for the current game to finish")
+        game_thread.join(timeout)
+        return not game_thread.is_alive()
+    
     def run_game_loop(self):
         """Run the main game loop in a separate thread"""
         while not self.game_over and self.current_turn < self.max_turns:
-            self.process_turn()
-            time.sleep(2)  # Brief pause between turns
+            with self.profiler.profile(f"{self.game_id}-turn{self.current_turn + 1}"):
+                self.process_turn()
+            time.sleep(self.turn_pause)  # Brief pause between turns
 
 # Initialize the referee
 referee = WordleReferee()
 
+# Warm-up progress, reported by /ready
+readiness = Readiness("referee_server")
+
 @app.route('/')
 def index():
     """Serve the main game interface"""
@@ -340,7 +381,19 @@ def index():
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "referee_server"})
+    players = {breaker.name: breaker.status() for breaker in referee.player_breakers.values()}
+    all_ready = all(status['ready'] for status in players.values())
+    return jsonify({
+        "status": "healthy" if all_ready else "degraded",
+        "service": "referee_server",
+        "players": players,
+        "profiling": referee.profiler.metrics()
+    })
+
+@app.route('/ready')
+def ready_check():
+    """Readiness probe: 503 until warm-up has finished and again while draining"""
+    return jsonify(readiness.status()), 200 if readiness.is_ready else 503
 
 @socketio.on('connect')
 def handle_connect():
@@ -362,6 +415,25 @@ def handle_log_event(data):
 @socketio.on('start_game')
 def handle_start_game():
     """Handle start game request"""
+    if not referee.accepting_games:
+        emit('error', {'message': 'Server is shutting down'})
+        return
+    if readiness.warming_up:
+        emit('error', {'message': 'Server is still warming up, try again in a moment'})
+        return
+    if readiness.failed:
+        emit('error', {'message': 'Server failed to warm up, check /ready and restart it'})
+        return
+    unready = referee.unready_players()
+    if unready:
+        # A player that is warming up would reject every guess and forfeit its turns
+        emit('error', {'message': f"{' and '.join(unready)} not ready yet, try again in a moment"})
+        return
+    if referee.game_thread is not None and referee.game_thread.is_alive():
+        # Starting a game clears the turn log the running game still reads from
+        emit('error', {'message': 'A game is already in progress'})
+        return
+    
     logger.info('Starting new game')
     
     if referee.start_new_game():
@@ -369,9 +441,16 @@ def handle_start_game():
         game_thread = threading.Thread(target=referee.run_game_loop)
         game_thread.daemon = True
         game_thread.start()
+        referee.game_thread = game_thread
     else:
         emit('error', {'message': 'Failed to start game'})
 
 if __name__ == '__main__':
-    logger.info("Starting Referee Server on port 5000")
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True)
+    # Probe both players in the background so a missing server fails fast from the first turn
+    readiness.start_warm_up(referee.warm_up)
+    
+    # Development server; use `python serve.py referee` for production
+    host = get_setting('REFEREE_HOST', '0.0.0.0')
+    port = get_setting('REFEREE_PORT', 5000, int)
+    logger.info(f"Starting Referee Server on port {port}")
+    socketio.run(app, host=host, port=port, debug=True)
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Sampling strategies for the LLM Wordle players
+Hedged sampling launches a second, more conservative generation when the first
+one is slow or unusable and keeps whichever produces a valid guess first.
+Voting runs k generations in parallel and returns the best-scoring guess
+with the most votes.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, List, FrozenSet, Any, Optional, Tuple
+
+from config import get_setting
+from precomputed import load_dictionary
+from profiling import attach_profile, current_profile
+from wordle_logic import is_consistent
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationCancelled(Exception):
+    """
+    Raised by a generate call whose cancel event was set because another sample already won
+    """
+
+
+# parsing_method of a guess taken from the fallback word list instead of the model
+FALLBACK_METHOD = 'FALLBACK - backend unavailable'
+
+
+class FallbackResponse(str):
+    """
+    Text returned by a generate call that could not reach the model.
+    Parsers tag it with FALLBACK_METHOD so it never wins a hedge or casts a vote.
+    """
+
+    def __new__(cls, word: str, text: str):
+        response = super().__new__(cls, text)
+        response.word = word
+        return response
+
+
+def is_unusable_method(parsing_method: str) -> bool:
+    """Parsing errors and fallback words are not real guesses from the model"""
+    return parsing_method.startswith(('ERROR', 'FALLBACK'))
+
+
+def is_usable_guess(parsed: Dict[str, str], history: List[Dict[str, str]], dictionary) -> bool:
+    """
+    A parsed response is usable when it produced a real guess that is in the
+    dictionary and consistent with the feedback received so far
+    """
+    word = parsed.get('word_guess', '')
+    if word == 'RETRY' or is_unusable_method(parsed.get('parsing_method', '')):
+        return False
+    return word in dictionary and is_consistent(word, history)
+
+
+@lru_cache(maxsize=None)
+def guess_dictionary(extra_words: Tuple[str, ...] = ()) -> FrozenSet[str]:
+    """Dictionary plus a player's extra words, loaded on first use rather than at import"""
+    return load_dictionary() | frozenset(extra_words)
+
+
+class HedgedSampler:
+    """
+    Runs a primary sample and, after hedge_delay seconds or as soon as the
+    primary comes back unusable, a hedge sample with different options.
+    The first usable guess wins and the other generation is cancelled.
+    """
+
+    def __init__(self, generate: Callable[..., str], parse: Callable[[str], Dict[str, str]],
+                 hedge_delay: Optional[float] = None, primary_options: Optional[Dict[str, Any]] = None,
+                 hedge_options: Optional[Dict[str, Any]] = None, extra_words: Optional[List[str]] = None):
+        self.generate = generate
+        self.parse = parse
+        self.hedge_delay = hedge_delay
+        self.primary_options = primary_options or {}
+        self.hedge_options = hedge_options or {}
+        self.extra_words = tuple(extra_words or ())
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'hedges_launched': 0,
+            'hedge_wins': 0,
+            'primary_wins': 0,
+            'no_usable_sample': 0,
+            'cancelled': 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.hedge_delay is not None
+
+    @property
+    def dictionary(self) -> FrozenSet[str]:
+        return guess_dictionary(self.extra_words)
+
+    @classmethod
+    def from_env(cls, generate, parse, primary_options=None, hedge_options=None, extra_words=None) -> "HedgedSampler":
+        """
+        PLAYER_HEDGE_DELAY enables hedging: seconds to wait before launching the
+        hedge sample (0 = launch both at once, unset = hedging disabled).
+        PLAYER_HEDGE_TEMPERATURE sets the hedge sample's temperature.
+        """
+        hedge_delay = get_setting('PLAYER_HEDGE_DELAY', None, float)
+        hedge_options = dict(hedge_options or {})
+        hedge_options['temperature'] = get_setting('PLAYER_HEDGE_TEMPERATURE', hedge_options.get('temperature', 0.3), float)
+        return cls(generate, parse, hedge_delay, primary_options, hedge_options, extra_words)
+
+    def sample(self, prompt: str, history: List[Dict[str, str]], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Returns the winning parsed response with a 'sampling' report attached
+        """
+        started_at = time.monotonic()
+        results = queue.Queue()
+        cancel_events = {'primary': threading.Event(), 'hedge': threading.Event()}
+        profile = current_profile()
+
+        def run(label: str, options: Dict[str, Any]):
+            with attach_profile(profile):
+                try:
+                    raw_response = self.generate(prompt, deadline=deadline, cancel_event=cancel_events[label], **options)
+                    parsed = self.parse(raw_response)
+                except Exception as e:
+                    logger.error(f"{label} sample failed: {e}")
+                    parsed = None
+            results.put((label, parsed, time.monotonic() - started_at))
+
+        def launch(label: str, options: Dict[str, Any]):
+            worker = threading.Thread(target=run, args=(label, options), name=f"sample-{label}")
+            worker.daemon = True
+            worker.start()
+
+        launch('primary', self.primary_options)
+        launched = ['primary']
+        finished = {}
+        winner = None
+
+        while len(finished) < len(launched):
+            wait_for = None
+            if 'hedge' not in launched:
+                wait_for = max(self.hedge_delay - (time.monotonic() - started_at), 0)
+            try:
+                label, parsed, latency = results.get(timeout=wait_for)
+            except queue.Empty:
+                label = None
+
+            if label is not None:
+                finished[label] = (parsed, latency)
+                if parsed is not None and is_usable_guess(parsed, history, self.dictionary):
+                    winner = label
+                    break
+
+            # Hedge once the delay has elapsed or the primary came back unusable
+            if 'hedge' not in launched:
+                launch('hedge', self.hedge_options)
+                launched.append('hedge')
+
+        # Cancel whatever is still generating
+        for label in launched:
+            if label not in finished:
+                cancel_events[label].set()
+
+        if winner is None:
+            # Nothing usable: prefer a parsed guess over a RETRY, primary first
+            candidates = [finished[label][0] for label in ('primary', 'hedge')
+                          if label in finished and finished[label][0] is not None]
+            parsed_guesses = [c for c in candidates if c.get('word_guess') != 'RETRY']
+            result = dict((parsed_guesses or candidates or [self.parse('')])[0])
+        else:
+            result = dict(finished[winner][0])
+
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['hedges_launched'] += 'hedge' in launched
+            self._stats['cancelled'] += len(launched) - len(finished)
+            if winner is None:
+                self._stats['no_usable_sample'] += 1
+            else:
+                self._stats[f'{winner}_wins'] += 1
+
+        result['sampling'] = {
+            'strategy': 'hedged',
+            'hedge_delay': self.hedge_delay,
+            'hedge_options': self.hedge_options,
+            'samples_launched': len(launched),
+            'winner': winner or 'none usable',
+            'latency': round(time.monotonic() - started_at, 3),
+        }
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters for trading extra compute against tail latency"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'hedge_delay': self.hedge_delay,
+                'hedge_options': self.hedge_options,
+                **self._stats
+            }
+
+
+# Scores used by the voting sampler, best first
+SCORE_USABLE = 2       # in the dictionary and consistent with the feedback so far
+SCORE_PARSED = 1       # a 5-letter guess, but unknown or inconsistent
+SCORE_UNUSABLE = 0     # RETRY, a parsing error or a fallback word
+
+
+class VotingSampler:
+    """
+    Runs k samples in parallel, scores each guess against the dictionary and
+    the feedback so far, and returns the highest-scoring guess with the most
+    votes. Samples still running when a guess has a majority, or when the
+    latency budget runs out, are cancelled.
+    """
+
+    def __init__(self, generate: Callable[..., str], parse: Callable[[str], Dict[str, str]],
+                 samples: int = 1, latency_budget: Optional[float] = None,
+                 options: Optional[Dict[str, Any]] = None, extra_words: Optional[List[str]] = None):
+        self.generate = generate
+        self.parse = parse
+        self.samples = max(1, samples)
+        self.latency_budget = latency_budget
+        self.options = options or {}
+        self.extra_words = tuple(extra_words or ())
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'samples_launched': 0,
+            'samples_finished': 0,
+            'cancelled': 0,
+            'early_majority': 0,
+            'unanimous': 0,
+            'no_usable_sample': 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.samples > 1
+
+    @property
+    def dictionary(self) -> FrozenSet[str]:
+        return guess_dictionary(self.extra_words)
+
+    @classmethod
+    def from_env(cls, generate, parse, options=None, extra_words=None) -> "VotingSampler":
+        """
+        PLAYER_VOTE_SAMPLES enables voting with k parallel samples (unset or 1 =
+        disabled). PLAYER_VOTE_BUDGET caps, in seconds, how long to wait for more
+        votes once the first sample is in (unset = wait for all of them).
+        """
+        return cls(
+            generate,
+            parse,
+            samples=get_setting('PLAYER_VOTE_SAMPLES', 1, int),
+            latency_budget=get_setting('PLAYER_VOTE_BUDGET', None, float),
+            options=options,
+            extra_words=extra_words
+        )
+
+    def score(self, parsed: Optional[Dict[str, str]], history: List[Dict[str, str]]) -> int:
+        if parsed is None:
+            return SCORE_UNUSABLE
+        word = parsed.get('word_guess', '')
+        if word == 'RETRY' or is_unusable_method(parsed.get('parsing_method', '')) or len(word) != 5:
+            return SCORE_UNUSABLE
+        if is_usable_guess(parsed, history, self.dictionary):
+            return SCORE_USABLE
+        return SCORE_PARSED
+
+    def sample(self, prompt: str, history: List[Dict[str, str]], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Returns the winning parsed response with a 'sampling' report attached,
+        including the vote distribution
+        """
+        started_at = time.monotonic()
+        results = queue.Queue()
+        cancel_event = threading.Event()
+        profile = current_profile()
+
+        def run(index: int):
+            with attach_profile(profile):
+                try:
+                    raw_response = self.generate(prompt, deadline=deadline, cancel_event=cancel_event, **self.options)
+                    if cancel_event.is_set():
+                        # Voting is over; nobody reads this sample
+                        return
+                    parsed = self.parse(raw_response)
+                except Exception as e:
+                    logger.error(f"Vote sample {index} failed: {e}")
+                    parsed = None
+            results.put((index, parsed, time.monotonic() - started_at))
+
+        for index in range(self.samples):
+            worker = threading.Thread(target=run, args=(index,), name=f"vote-{index}")
+            worker.daemon = True
+            worker.start()
+
+        finished = []
+        votes = Counter()
+        fallbacks = 0
+        majority = False
+        first_at = None
+        while len(finished) < self.samples:
+            timeout = None
+            if self.latency_budget is not None and first_at is not None:
+                # The budget counts from the first vote, however long that one took
+                timeout = max(self.latency_budget - (time.monotonic() - first_at), 0)
+            try:
+                index, parsed, latency = results.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if first_at is None:
+                first_at = time.monotonic()
+
+            score = self.score(parsed, history)
+            word = parsed.get('word_guess', 'RETRY') if parsed is not None else 'ERROR'
+            finished.append({'parsed': parsed, 'word': word, 'score': score, 'latency': latency})
+            if parsed is not None and parsed.get('parsing_method') == FALLBACK_METHOD:
+                # The backend was unavailable; a random word is not a vote
+                fallbacks += 1
+            else:
+                votes[word] += 1
+
+            # A usable guess held by a majority of k cannot be outvoted
+            if score == SCORE_USABLE and votes[word] > self.samples // 2:
+                majority = len(finished) < self.samples
+                break
+
+        # Stop whatever is still generating
+        cancel_event.set()
+
+        # Best score first, then most votes, then the earliest to arrive
+        best = {}
+        for position, sample in enumerate(finished):
+            current = best.get(sample['word'])
+            if current is None or sample['score'] > current['score']:
+                best[sample['word']] = {'score': sample['score'], 'position': position}
+        winner = max(best, key=lambda word: (best[word]['score'], votes[word], -best[word]['position']))
+        winning_sample = finished[best[winner]['position']]
+        result = dict(winning_sample['parsed'] or self.parse(''))
+
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['samples_launched'] += self.samples
+            self._stats['samples_finished'] += len(finished)
+            self._stats['cancelled'] += self.samples - len(finished)
+            self._stats['early_majority'] += majority
+            self._stats['unanimous'] += len(votes) == 1 and not fallbacks and len(finished) == self.samples
+            self._stats['no_usable_sample'] += winning_sample['score'] != SCORE_USABLE
+
+        result['sampling'] = {
+            'strategy': 'vote',
+            'samples': self.samples,
+            'finished': len(finished),
+            'votes': dict(votes.most_common()),
+            'fallbacks': fallbacks,
+            'scores': {word: best[word]['score'] for word in best},
+            'winner': winner,
+            'agreement': round(votes[winner] / len(finished), 3),
+            'latency_budget': self.latency_budget,
+            'latency': round(time.monotonic() - started_at, 3),
+        }
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters for trading parallel compute against wasted turns"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'samples': self.samples,
+                'latency_budget': self.latency_budget,
+                **self._stats
+            }
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the LLM Wordle servers
+Runs each server without the debugger or reloader, warms it up in the
+background (/ready reports progress until it is done) and drains in-flight
+work on SIGTERM/SIGINT before exiting
+
+Usage:
+    python serve.py player1
+    python serve.py player2
+    python serve.py referee
+
+Players run under gunicorn (gthread workers) when it is installed, otherwise
+under waitress (Windows) or werkzeug's threaded server. The referee runs a
+single gevent (or eventlet) process because game state lives in memory.
+Settings are read with config.get_setting (environment, then wordle_config.json).
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import signal
+import sys
+import time
+
+from config import get_setting
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('serve')
+
+# Service name -> (module, settings prefix, default port)
+SERVICES = {
+    'player1': ('player1_server', 'PLAYER1', 5001),
+    'player2': ('player2_server', 'PLAYER2', 5002),
+    'referee': ('referee_server', 'REFEREE', 5000),
+}
+
+# Seconds to keep serving after a drain so the last responses are written out
+DRAIN_LINGER = 0.5
+
+
+def install_drain_handler(name: str, drain, async_mode: str = 'threading'):
+    """
+    Runs drain() on the first SIGTERM/SIGINT, then exits through SystemExit so
+    atexit handlers (transcript indexes, spill files) still run.
+    A second signal while draining stops the process without waiting.
+
+    Under gevent and eventlet the handler runs in the hub, where blocking is not
+    allowed, so it only spawns a greenlet that drains; SystemExit raised by that
+    greenlet is re-raised in the main greenlet by the hub.
+    """
+    def drain_and_exit(signum):
+        logger.info(f"Received signal {signum}, draining {name}")
+        if not drain():
+            logger.warning(f"{name} drain timed out with work still in flight")
+        time.sleep(DRAIN_LINGER)
+        raise SystemExit(0)
+
+    if async_mode == 'threading':
+        def handle_signal(signum, frame):
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            drain_and_exit(signum)
+
+        signal.signal(signal.SIGTERM, handle_signal)
+        signal.signal(signal.SIGINT, handle_signal)
+        return
+
+    if async_mode == 'gevent':
+        import gevent
+        spawn = gevent.spawn
+    else:
+        import eventlet
+        spawn = eventlet.spawn
+
+    draining = []
+
+    def handle_signal_async(signum, frame=None):
+        if draining:
+            logger.warning(f"Received signal {signum} while draining, exiting {name} now")
+            os._exit(1)
+        draining.append(spawn(drain_and_exit, signum))
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        if async_mode == 'gevent':
+            gevent.signal_handler(signum, handle_signal_async, signum)
+        else:
+            signal.signal(signum, handle_signal_async)
+
+
+def player_threads() -> int:
+    """Enough threads per worker for every inference slot and queued request, plus health checks"""
+    return get_setting('PLAYER_INFERENCE_SLOTS', 1, int) + get_setting('PLAYER_MAX_QUEUE', 4, int) + 2
+
+
+def serve_player_gunicorn(module_name: str, host: str, port: int, drain_timeout: float):
+    from gunicorn.app.base import BaseApplication
+
+    def post_worker_init(worker):
+        module = sys.modules[module_name]
+        module.readiness.start_warm_up(module.player.warm_up)
+
+        # Reject new guesses as soon as the worker is told to stop; gunicorn
+        # then waits up to graceful_timeout for the requests already running
+        default_exit = worker.handle_exit
+
+        def handle_exit(signum, frame):
+            module.readiness.start_draining()
+            module.admission.start_draining()
+            default_exit(signum, frame)
+
+        signal.signal(signal.SIGTERM, handle_exit)
+
+    class PlayerApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{host}:{port}")
+            self.cfg.set('workers', get_setting('PLAYER_WORKERS', 1, int))
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', player_threads())
+            self.cfg.set('graceful_timeout', drain_timeout)
+            self.cfg.set('post_worker_init', post_worker_init)
+
+        def load(self):
+            # Imported in each worker so model handles and transcript files are not shared across forks
+            return importlib.import_module(module_name).app
+
+    PlayerApplication().run()
+
+
+def serve_player_threaded(module_name: str, host: str, port: int, drain_timeout: float):
+    module = importlib.import_module(module_name)
+    module.readiness.start_warm_up(module.player.warm_up)
+    install_drain_handler(module_name, lambda: module.drain(drain_timeout))
+
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+
+    if serve is not None:
+        serve(module.app, host=host, port=port, threads=player_threads())
+    else:
+        from werkzeug.serving import make_server
+        logger.warning("Neither gunicorn nor waitress is installed, using werkzeug's threaded server")
+        make_server(host, port, module.app, threaded=True).serve_forever()
+
+
+ASYNC_MODES = ('gevent', 'eventlet', 'threading')
+
+
+def detect_async_mode() -> str:
+    """REFEREE_ASYNC_MODE if set, otherwise gevent, then eventlet, then threading"""
+    mode = get_setting('REFEREE_ASYNC_MODE')
+    if mode:
+        if mode not in ASYNC_MODES:
+            raise ValueError(f"Unknown REFEREE_ASYNC_MODE {mode!r}; expected one of {', '.join(ASYNC_MODES)}")
+        return mode
+    for candidate in ('gevent', 'eventlet'):
+        try:
+            importlib.import_module(candidate)
+            return candidate
+        except ImportError:
+            continue
+    logger.warning("Neither gevent nor eventlet is installed, the referee falls back to threading mode")
+    return 'threading'
+
+
+def serve_referee(host: str, port: int):
+    async_mode = detect_async_mode()
+
+    # Patch the standard library before anything creates sockets or threads
+    if async_mode == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+    elif async_mode == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    os.environ['REFEREE_ASYNC_MODE'] = async_mode
+
+    referee_server = importlib.import_module('referee_server')
+    referee_server.readiness.start_warm_up(referee_server.referee.warm_up)
+
+    drain_timeout = get_setting('REFEREE_DRAIN_TIMEOUT', 300, float)
+
+    def drain():
+        referee_server.readiness.start_draining()
+        return referee_server.referee.drain(drain_timeout)
+
+    install_drain_handler('referee_server', drain, async_mode)
+
+    logger.info(f"Starting Referee Server on {host}:{port} ({async_mode} mode)")
+    referee_server.socketio.run(
+        referee_server.app,
+        host=host,
+        port=port,
+        debug=False,
+        use_reloader=False,
+        allow_unsafe_werkzeug=async_mode == 'threading'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run an LLM Wordle server in production mode")
+    parser.add_argument('service', choices=sorted(SERVICES), help="Server to run")
+    args = parser.parse_args()
+
+    module_name, prefix, default_port = SERVICES[args.service]
+    host = get_setting(f'{prefix}_HOST', '0.0.0.0')
+    port = get_setting(f'{prefix}_PORT', default_port, int)
+
+    if args.service == 'referee':
+        serve_referee(host, port)
+    else:
+        drain_timeout = get_setting('PLAYER_DRAIN_TIMEOUT', 60, float)
+        try:
+            importlib.import_module('gunicorn')
+            use_gunicorn = os.name == 'posix'
+        except ImportError:
+            use_gunicorn = False
+
+        logger.info(f"Starting {module_name} on {host}:{port} ({'gunicorn' if use_gunicorn else 'threaded'})")
+        if use_gunicorn:
+            serve_player_gunicorn(module_name, host, port, drain_timeout)
+        else:
+            serve_player_threaded(module_name, host, port, drain_timeout)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Headless game runner for the LLM Wordle referee
+Plays games back to back against the running player servers without the web
+interface. Start the players with WORDLE_LLM_MODE=replay for fast,
+reproducible runs on a machine with no models installed.
+
+Usage:
+    python simulate_games.py --games 1000 --seed 42
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import time
+
+# No pause between turns unless explicitly requested
+os.environ.setdefault('REFEREE_TURN_PAUSE', '0')
+
+from referee_server import referee
+
+logger = logging.getLogger(__name__)
+
+
+def run_games(games: int, seed: int):
+    """Runs the given number of games and returns summary statistics"""
+    random.seed(seed)
+    winners = {}
+    total_turns = 0
+    started_at = time.monotonic()
+
+    for game in range(games):
+        referee.start_new_game()
+        referee.run_game_loop()
+        winners[referee.winner] = winners.get(referee.winner, 0) + 1
+        total_turns += referee.current_turn
+        logger.info(f"Game {game + 1}/{games}: {referee.secret_word} -> {referee.winner}")
+
+    elapsed = time.monotonic() - started_at
+    return {
+        'games': games,
+        'seed': seed,
+        'winners': winners,
+        'avg_turns': round(total_turns / games, 2) if games else 0,
+        'elapsed_seconds': round(elapsed, 2),
+        'games_per_second': round(games / elapsed, 2) if elapsed else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run LLM Wordle games without the web interface")
+    parser.add_argument('--games', type=int, default=10, help="Number of games to play")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for secret word selection")
+    parser.add_argument('--verbose', action='store_true', help="Log every turn")
+    args = parser.parse_args()
+
+    # The referee configures logging at import, so only adjust the level here
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    print(json.dumps(run_games(args.games, args.seed), indent=2))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the LLM Wordle servers
+Starts a server through serve.py several times and measures how long it takes
+to import, to answer its first HTTP request and to report ready on /ready,
+with the per-step warm-up timings of the last run.
+
+Usage:
+    python startup_benchmark.py player1 --runs 5
+    python startup_benchmark.py referee --runs 3 --target 1.0
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+import requests
+
+from serve import SERVICES
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def import_seconds(module_name: str) -> float:
+    """Cumulative import time of the server module, from python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        cwd=PACKAGE_DIR, capture_output=True, text=True
+    )
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| ' + re.escape(module_name) + r'$', line)
+        if match:
+            return int(match.group(1)) / 1e6
+    raise RuntimeError(f"Could not import {module_name}: {result.stderr.strip()[-300:]}")
+
+
+def measure_start(service: str, timeout: float) -> Dict[str, Any]:
+    """One cold start: seconds until the port answers and until /ready returns 200"""
+    _, prefix, _ = SERVICES[service]
+    port = free_port()
+    env = dict(os.environ, **{f'{prefix}_PORT': str(port), f'{prefix}_HOST': '127.0.0.1'})
+    ready_url = f"http://127.0.0.1:{port}/ready"
+
+    started_at = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, 'serve.py', service],
+        cwd=PACKAGE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    listening = None
+    ready = None
+    status = None
+    try:
+        while time.monotonic() - started_at < timeout and process.poll() is None:
+            try:
+                response = requests.get(ready_url, timeout=1)
+            except requests.RequestException:
+                time.sleep(0.01)
+                continue
+            if listening is None:
+                listening = time.monotonic() - started_at
+            status = response.json()
+            if response.status_code == 200:
+                ready = time.monotonic() - started_at
+                break
+            time.sleep(0.01)
+    finally:
+        process.send_signal(signal.SIGINT if os.name == 'nt' else signal.SIGTERM)
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    return {'listening': listening, 'ready': ready, 'status': status}
+
+
+def summarize(values: List[Optional[float]]) -> Optional[Dict[str, float]]:
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {
+        'median': round(statistics.median(values), 3),
+        'min': round(min(values), 3),
+        'max': round(max(values), 3)
+    }
+
+
+def run_benchmark(service: str, runs: int, timeout: float) -> Dict[str, Any]:
+    module_name = SERVICES[service][0]
+    imports = [import_seconds(module_name) for _ in range(runs)]
+    starts = [measure_start(service, timeout) for _ in range(runs)]
+
+    last_status = next((start['status'] for start in reversed(starts) if start['status']), None)
+    return {
+        'service': service,
+        'runs': runs,
+        'import_seconds': summarize(imports),
+        'listening_seconds': summarize([start['listening'] for start in starts]),
+        'ready_seconds': summarize([start['ready'] for start in starts]),
+        'not_ready_runs': sum(1 for start in starts if start['ready'] is None),
+        'warm_up_steps': last_status.get('steps') if last_status else None
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure LLM Wordle server startup time")
+    parser.add_argument('service', choices=sorted(SERVICES), help="Server to start")
+    parser.add_argument('--runs', type=int, default=5, help="Number of cold starts")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Seconds to wait for /ready per start")
+    parser.add_argument('--target', type=float, default=None,
+                        help="Fail (exit code 1) if the median time to ready exceeds this many seconds")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.service, args.runs, args.timeout)
+    print(json.dumps(report, indent=2))
+
+    if args.target is not None:
+        median_ready = report['ready_seconds']['median'] if report['ready_seconds'] else None
+        if median_ready is None or median_ready > args.target:
+            print(f"Median time to ready {median_ready}s exceeds the {args.target}s target", file=sys.stderr)
+            sys.exit(1)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Compact turn records for the LLM Wordle referee
+Guesses are stored as word ids, feedback as a packed base-3 integer and raw
+LLM text in a deduplicated, size-bounded store that spills to disk. The emoji
+and text form is only rebuilt when a turn is sent over the wire.
+"""
+
+import hashlib
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+from wordle_logic import WORD_LIST, unpack_feedback
+
+
+@dataclass
+class TurnRecord:
+    """One player's guess for one turn"""
+    __slots__ = ('turn', 'word_id', 'feedback', 'comments_id', 'raw_id', 'parsing_method')
+    turn: int
+    word_id: int
+    feedback: int
+    comments_id: int
+    raw_id: int
+    parsing_method: str
+
+
+class WordTable:
+    """
+    Interns guesses as small integer ids. Dictionary words keep their position
+    in WORD_LIST; words outside the dictionary are appended on first use.
+    """
+
+    def __init__(self, words: Optional[List[str]] = None):
+        self._words = list(words if words is not None else WORD_LIST)
+        self._ids = {word: word_id for word_id, word in enumerate(self._words)}
+        self._dictionary_size = len(self._words)
+        self._lock = threading.Lock()
+
+    def intern(self, word: str) -> int:
+        word_id = self._ids.get(word)
+        if word_id is None:
+            with self._lock:
+                word_id = self._ids.get(word)
+                if word_id is None:
+                    word_id = len(self._words)
+                    self._words.append(word)
+                    self._ids[word] = word_id
+        return word_id
+
+    def word(self, word_id: int) -> str:
+        return self._words[word_id]
+
+    def clear(self):
+        """Forgets the words appended since the dictionary was loaded"""
+        with self._lock:
+            for word in self._words[self._dictionary_size:]:
+                del self._ids[word]
+            del self._words[self._dictionary_size:]
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+
+class TextStore:
+    """
+    Deduplicated store for LLM text. Up to max_bytes are kept in memory;
+    least recently used entries beyond that are spilled to a file on disk.
+    """
+
+    EMPTY = 0  # Reserved id for the empty string
+
+    def __init__(self, max_bytes: int = 1024 * 1024, spill_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # id -> encoded text
+        self._memory_bytes = 0
+        self._spilled = {}  # id -> (offset, length)
+        self._ids_by_digest = {}
+        self._next_id = 1
+        self._spill_file = None
+
+    def put(self, text: str) -> int:
+        """Stores text and returns its id; identical text always gets the same id"""
+        if not text:
+            return self.EMPTY
+
+        encoded = text.encode('utf-8')
+        digest = hashlib.blake2b(encoded, digest_size=16).digest()
+        with self._lock:
+            text_id = self._ids_by_digest.get(digest)
+            if text_id is not None:
+                if text_id in self._memory:
+                    self._memory.move_to_end(text_id)
+                return text_id
+
+            text_id = self._next_id
+            self._next_id += 1
+            self._ids_by_digest[digest] = text_id
+            self._memory[text_id] = encoded
+            self._memory_bytes += len(encoded)
+            self._spill_over_budget()
+            return text_id
+
+    def get(self, text_id: int) -> str:
+        if text_id == self.EMPTY:
+            return ''
+
+        with self._lock:
+            encoded = self._memory.get(text_id)
+            if encoded is not None:
+                self._memory.move_to_end(text_id)
+            else:
+                offset, length = self._spilled[text_id]
+                self._spill_file.seek(offset)
+                encoded = self._spill_file.read(length)
+        return encoded.decode('utf-8')
+
+    def clear(self):
+        """Drops every entry and truncates the spill file; ids handed out before are invalid"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._spilled.clear()
+            self._ids_by_digest.clear()
+            self._next_id = 1
+            if self._spill_file is not None:
+                self._spill_file.seek(0)
+                self._spill_file.truncate()
+
+    def _spill_over_budget(self):
+        """Moves the least recently used entries to disk. Caller holds the lock."""
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            text_id, encoded = self._memory.popitem(last=False)
+            self._memory_bytes -= len(encoded)
+
+            if self._spill_file is None:
+                if self.spill_path:
+                    self._spill_file = open(self.spill_path, 'w+b')
+                else:
+                    self._spill_file = tempfile.TemporaryFile(prefix='wordle_text_')
+            self._spill_file.seek(0, 2)
+            self._spilled[text_id] = (self._spill_file.tell(), len(encoded))
+            self._spill_file.write(encoded)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': self._next_id - 1,
+                'in_memory': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'spilled': len(self._spilled),
+            }
+
+
+class TurnLog:
+    """
+    Creates compact turn records and converts them back to the wire format.
+    The referee keeps one log per game and clears it when a new game starts,
+    so stored text and spill file stay bounded by a single game.
+    """
+
+    def __init__(self, words: Optional[WordTable] = None, texts: Optional[TextStore] = None):
+        self.words = words or WordTable()
+        self.texts = texts or TextStore()
+
+    def clear(self):
+        """Drops everything recorded so far; earlier TurnRecords can no longer be resolved"""
+        self.words.clear()
+        self.texts.clear()
+
+    def record(self, turn: int, guess: str, feedback: int, comments: str,
+               raw_response: str, parsing_method: str) -> TurnRecord:
+        return TurnRecord(
+            turn=turn,
+            word_id=self.words.intern(guess),
+            feedback=feedback,
+            comments_id=self.texts.put(comments),
+            raw_id=self.texts.put(raw_response),
+            parsing_method=sys.intern(parsing_method)
+        )
+
+    def history_wire(self, records: List[TurnRecord]) -> List[Dict[str, str]]:
+        """History in the format the players expect"""
+        return [
+            {'guess': self.words.word(record.word_id), 'feedback': unpack_feedback(record.feedback)}
+            for record in records
+        ]
+
+    def turn_wire(self, record: TurnRecord) -> Dict[str, Any]:
+        """
+        Turn details for the frontend. Comments identical to the raw response
+        are sent once; the frontend only shows comments that differ from it.
+        """
+        same_text = record.comments_id == record.raw_id
+        return {
+            'turn': record.turn,
+            'guess': self.words.word(record.word_id),
+            'feedback': unpack_feedback(record.feedback),
+            'comments': '' if same_text else self.texts.get(record.comments_id),
+            'raw_response': self.texts.get(record.raw_id),
+            'parsing_method': record.parsing_method
+        }
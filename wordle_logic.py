@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Shared Wordle rules for the LLM Wordle servers
+Holds the dictionary and the deterministic feedback logic so the referee and
+the players agree on what a valid, history-consistent guess is
+"""
+
+from typing import Dict, List
+
+# Common 5-letter Wordle words
+WORD_LIST = [
+    "ABOUT", "ABOVE", "ABUSE", "ACTOR", "ACUTE", "ADMIT", "ADOPT", "ADULT", "AFTER", "AGAIN",
+    "AGENT", "AGREE", "AHEAD", "ALARM", "ALBUM", "ALERT", "ALIEN", "ALIGN", "ALIKE", "ALIVE",
+    "ALLOW", "ALONE", "ALONG", "ALTER", "ANGEL", "ANGER", "ANGLE", "ANGRY", "APART", "APPLE",
+    "APPLY", "ARENA", "ARGUE", "ARISE", "ARRAY", "ASIDE", "ASSET", "AUDIO", "AUDIT", "AVOID",
+    "AWAKE", "AWARD", "AWARE", "BADLY", "BAKER", "BASES", "BASIC", "BEACH", "BEGAN", "BEGIN",
+    "BEING", "BELOW", "BENCH", "BILLY", "BIRTH", "BLACK", "BLAME", "BLANK", "BLAST", "BLIND",
+    "BLOCK", "BLOOD", "BOARD", "BOAST", "BOATS", "BOBBY", "BONDS", "BOOST", "BOOTH", "BOUND",
+    "BRAIN", "BRAND", "BRASS", "BRAVE", "BREAD", "BREAK", "BREED", "BRIEF", "BRING", "BROAD",
+    "BROKE", "BROWN", "BUILD", "BUILT", "BUYER", "CABLE", "CALIF", "CARRY", "CATCH", "CAUSE",
+    "CHAIN", "CHAIR", "CHAOS", "CHARM", "CHART", "CHASE", "CHEAP", "CHECK", "CHEST", "CHIEF",
+    "CHILD", "CHINA", "CHOSE", "CIVIL", "CLAIM", "CLASS", "CLEAN", "CLEAR", "CLICK", "CLIMB",
+    "CLOCK", "CLOSE", "CLOUD", "COACH", "COAST", "COULD", "COUNT", "COURT", "COVER", "CRAFT",
+    "CRANE", "CRASH", "CRAZY", "CREAM", "CRIME", "CROSS", "CROWD", "CROWN", "CRUDE", "CURVE",
+    "CYCLE", "DAILY", "DANCE", "DATED", "DEALT", "DEATH", "DEBUT", "DELAY", "DEPTH", "DOING",
+    "DOUBT", "DOZEN", "DRAFT", "DRAMA", "DRANK", "DREAM", "DRESS", "DRILL", "DRINK", "DRIVE",
+    "DROVE", "DYING", "EAGER", "EARLY", "EARTH", "EIGHT", "ELITE", "EMPTY", "ENEMY", "ENJOY",
+    "ENTER", "ENTRY", "EQUAL", "ERROR", "EVENT", "EVERY", "EXACT", "EXIST", "EXTRA", "FAITH",
+    "FALSE", "FAULT", "FIBER", "FIELD", "FIFTH", "FIFTY", "FIGHT", "FINAL", "FIRST", "FIXED",
+    "FLASH", "FLEET", "FLOOR", "FLUID", "FOCUS", "FORCE", "FORTH", "FORTY", "FORUM", "FOUND",
+    "FRAME", "FRANK", "FRAUD", "FRESH", "FRONT", "FRUIT", "FULLY", "FUNNY", "GIANT", "GIVEN",
+    "GLASS", "GLOBE", "GOING", "GRACE", "GRADE", "GRAND", "GRANT", "GRASS", "GRAVE", "GREAT",
+    "GREEN", "GROSS", "GROUP", "GROWN", "GUARD", "GUESS", "GUEST", "GUIDE", "HAPPY", "HARRY",
+    "HEART", "HEAVY", "HENCE", "HENRY", "HORSE", "HOTEL", "HOUSE", "HUMAN", "IDEAL", "IMAGE",
+    "INDEX", "INNER", "INPUT", "ISSUE", "JAPAN", "JIMMY", "JOINT", "JONES", "JUDGE", "KNOWN",
+    "LABEL", "LARGE", "LASER", "LATER", "LAUGH", "LAYER", "LEARN", "LEASE", "LEAST", "LEAVE",
+    "LEGAL", "LEVEL", "LEWIS", "LIGHT", "LIMIT", "LINKS", "LIVES", "LOCAL", "LOOSE", "LOWER",
+    "LUCKY", "LUNCH", "LYING", "MAGIC", "MAJOR", "MAKER", "MARCH", "MARIA", "MATCH", "MAYBE",
+    "MAYOR", "MEANT", "MEDIA", "METAL", "MIGHT", "MINOR", "MINUS", "MIXED", "MODEL", "MONEY",
+    "MONTH", "MORAL", "MOTOR", "MOUNT", "MOUSE", "MOUTH", "MOVED", "MOVIE", "MUSIC", "NEEDS",
+    "NEVER", "NEWLY", "NIGHT", "NOISE", "NORTH", "NOTED", "NOVEL", "NURSE", "OCCUR", "OCEAN",
+    "OFFER", "OFTEN", "ORDER", "OTHER", "OUGHT", "PAINT", "PANEL", "PAPER", "PARTY", "PEACE",
+    "PETER", "PHASE", "PHONE", "PHOTO", "PIANO", "PICKED", "PIECE", "PILOT", "PITCH", "PLACE",
+    "PLAIN", "PLANE", "PLANT", "PLATE", "POINT", "POUND", "POWER", "PRESS", "PRICE", "PRIDE",
+    "PRIME", "PRINT", "PRIOR", "PRIZE", "PROOF", "PROUD", "PROVE", "QUEEN", "QUICK", "QUIET",
+    "QUITE", "RADIO", "RAISE", "RANGE", "RAPID", "RATIO", "REACH", "READY", "REALM", "REBEL",
+    "REFER", "RELAX", "REPAY", "REPLY", "RIGHT", "RIGID", "RIVAL", "RIVER", "ROBIN", "ROGER",
+    "ROMAN", "ROUGH", "ROUND", "ROUTE", "ROYAL", "RURAL", "SCALE", "SCENE", "SCOPE", "SCORE",
+    "SENSE", "SERVE", "SEVEN", "SHALL", "SHAPE", "SHARE", "SHARP", "SHEET", "SHELF", "SHELL",
+    "SHIFT", "SHINE", "SHIRT", "SHOCK", "SHOOT", "SHORT", "SHOWN", "SIGHT", "SILLY", "SINCE",
+    "SIXTH", "SIXTY", "SIZED", "SKILL", "SLEEP", "SLIDE", "SMALL", "SMART", "SMILE", "SMITH",
+    "SMOKE", "SOLID", "SOLVE", "SORRY", "SOUND", "SOUTH", "SPACE", "SPARE", "SPEAK", "SPEED",
+    "SPEND", "SPENT", "SPLIT", "SPOKE", "SPORT", "STAFF", "STAGE", "STAKE", "STAND", "START",
+    "STATE", "STEAM", "STEEL", "STEEP", "STEER", "STICK", "STILL", "STOCK", "STONE", "STOOD",
+    "STORE", "STORM", "STORY", "STRIP", "STUCK", "STUDY", "STUFF", "STYLE", "SUGAR", "SUITE",
+    "SUPER", "SWEET", "TABLE", "TAKEN", "TASTE", "TAXES", "TEACH", "TEAMS", "TEETH", "TERRY",
+    "TEXAS", "THANK", "THEFT", "THEIR", "THEME", "THERE", "THESE", "THICK", "THING", "THINK",
+    "THIRD", "THOSE", "THREE", "THREW", "THROW", "THUMB", "TIGHT", "TIRED", "TITLE", "TODAY",
+    "TOPIC", "TOTAL", "TOUCH", "TOUGH", "TOWER", "TRACK", "TRADE", "TRAIN", "TREAT", "TREND",
+    "TRIAL", "TRIBE", "TRICK", "TRIED", "TRIES", "TRUCK", "TRULY", "TRUNK", "TRUST", "TRUTH",
+    "TWICE", "UNCLE", "UNDUE", "UNION", "UNITY", "UNTIL", "UPPER", "UPSET", "URBAN", "USAGE",
+    "USUAL", "VALID", "VALUE", "VIDEO", "VIRUS", "VISIT", "VITAL", "VOCAL", "VOICE", "WASTE",
+    "WATCH", "WATER", "WHEEL", "WHERE", "WHICH", "WHILE", "WHITE", "WHOLE", "WHOSE", "WOMAN",
+    "WOMEN", "WORLD", "WORRY", "WORSE", "WORST", "WORTH", "WOULD", "WRITE", "WRONG", "WROTE",
+    "YOUNG", "YOUTH"
+]
+
+CORRECT = '🟩'
+PRESENT = '🟨'
+ABSENT = '⬜'
+ALL_CORRECT = CORRECT * 5
+ALL_CORRECT_CODE = 242
+
+# Base-3 digits used to pack feedback into a single integer (0-242)
+FEEDBACK_DIGITS = {ABSENT: 0, PRESENT: 1, CORRECT: 2}
+FEEDBACK_SYMBOLS = (ABSENT, PRESENT, CORRECT)
+
+
+def feedback_code(guess: str, secret_word: str) -> int:
+    """
+    Scores a guess against the secret word as a packed base-3 integer
+    (2 = correct position, 1 = wrong position, 0 = not in word)
+    """
+    if len(guess) != 5 or len(secret_word) != 5:
+        return 0  # Invalid guess
+    
+    guess = guess.upper()
+    secret_word = secret_word.upper()
+    
+    digits = [0] * 5
+    secret_chars = list(secret_word)
+    
+    # First pass: mark exact matches
+    for i in range(5):
+        if guess[i] == secret_word[i]:
+            digits[i] = 2
+            secret_chars[i] = None  # Mark as used
+    
+    # Second pass: mark partial matches
+    for i in range(5):
+        if digits[i] == 0 and guess[i] in secret_chars:
+            digits[i] = 1
+            # Remove the first occurrence of this character
+            secret_chars[secret_chars.index(guess[i])] = None
+    
+    return digits[0] + 3 * digits[1] + 9 * digits[2] + 27 * digits[3] + 81 * digits[4]
+
+
+def evaluate_guess(guess: str, secret_word: str) -> str:
+    """
+    Evaluates a guess against the secret word and returns emoji feedback
+    🟩 = correct letter in correct position
+    🟨 = correct letter in wrong position
+    ⬜ = letter not in word
+    """
+    return unpack_feedback(feedback_code(guess, secret_word))
+
+
+def is_consistent(word: str, history: List[Dict[str, str]]) -> bool:
+    """
+    Checks that a candidate could still be the secret word given the
+    previous guesses and their feedback
+    """
+    word = word.upper()
+    for entry in history:
+        guess = str(entry.get('guess', '')).upper()
+        feedback = entry.get('feedback', '')
+        if len(guess) == 5 and evaluate_guess(guess, word) != feedback:
+            return False
+    return True
+
+
+def pack_feedback(feedback: str) -> int:
+    """Packs emoji feedback into a base-3 integer, first letter as the least significant digit"""
+    code = 0
+    for symbol in reversed(feedback):
+        code = code * 3 + FEEDBACK_DIGITS[symbol]
+    return code
+
+
+def unpack_feedback(code: int) -> str:
+    """Turns a packed base-3 feedback integer back into the emoji string"""
+    symbols = []
+    for _ in range(5):
+        symbols.append(FEEDBACK_SYMBOLS[code % 3])
+        code //= 3
+    return ''.join(symbols)
+
+
+def feedback_matrix(guesses: List[str], secrets: List[str]) -> List[bytearray]:
+    """
+    Feedback-pattern table: row i holds the packed feedback code of guesses[i]
+    against every secret word, one byte per secret
+    """
+    return [bytearray(feedback_code(guess, secret) for secret in secrets) for guess in guesses]